@@ -0,0 +1,85 @@
+"""
+Compares per-request overhead of frontik internal logging (routing and stage messages)
+with plain loggers and with hot path loggers, which skip records rejected by all handlers.
+
+Usage: python benchmarks/request_logging.py
+"""
+
+import io
+import logging
+import timeit
+from collections import namedtuple
+
+from frontik import request_context
+from frontik.loggers import ContextFilter, GlobalLogHandler, get_hot_path_logger, invalidate_hot_path_loggers
+
+Stage = namedtuple('Stage', ('name', 'delta', 'start_delta'))
+STAGES = ('prepare', 'page', 'tpl', 'postprocess', 'flush')
+
+
+class JoinContextFilter(logging.Filter):
+    def filter(self, record):
+        handler_name = request_context.get_handler_name()
+        request_id = request_context.get_request_id()
+        record.name = '.'.join(filter(None, [record.name, handler_name, request_id]))
+        return True
+
+
+def configure(logger, level, context_filter):
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setLevel(level)
+    handler.addFilter(context_filter)
+
+    logger.handlers = [handler, GlobalLogHandler()]
+    logger.propagate = False
+    invalidate_hot_path_loggers()
+
+
+def plain_request(logger):
+    logger.info('requested url: %s', '/page/?id=1')
+    logger.debug('using %r', logger)
+
+    for name in STAGES:
+        stage = Stage(name, 1.5, 0)
+        logger.debug('stage "%s" completed in %.2fms', stage.name, stage.delta, extra={'_stage': stage})
+
+
+def hot_path_request(logger):
+    logger.info('requested url: %s', '/page/?id=1')
+    logger.debug('using %r', logger)
+
+    for name in STAGES:
+        stage = Stage(name, 1.5, 0)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('stage "%s" completed in %.2fms', stage.name, stage.delta, extra={'_stage': stage})
+
+
+def main():
+    # as in bootstrap_core_logging, levels are set only for handlers
+    logging.root.setLevel(logging.NOTSET)
+
+    plain_logger = logging.getLogger('benchmark.plain')
+    hot_path_logger = get_hot_path_logger('benchmark.hot_path')
+
+    token = request_context.initialize(object(), '0123456789abcdef')
+    request_context.set_handler_name('pages.benchmark')
+    number = 20000
+
+    try:
+        for level in (logging.DEBUG, logging.INFO, logging.WARNING):
+            configure(plain_logger, level, JoinContextFilter())
+            configure(hot_path_logger, level, ContextFilter())
+
+            plain_time = timeit.timeit(lambda: plain_request(plain_logger), number=number)
+            hot_path_time = timeit.timeit(lambda: hot_path_request(hot_path_logger), number=number)
+
+            print(
+                f'handlers level {logging.getLevelName(level):<8} '
+                f'plain: {plain_time / number * 1e6:8.2f}us  hot path: {hot_path_time / number * 1e6:8.2f}us'
+            )
+    finally:
+        request_context.reset(token)
+
+
+if __name__ == '__main__':
+    main()
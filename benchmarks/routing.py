@@ -0,0 +1,53 @@
+"""
+Compares route lookup in FrontikRouter (prefix index) with a linear scan over all routes.
+
+Usage: python benchmarks/routing.py [routes_count]
+"""
+
+import re
+import sys
+import timeit
+
+from frontik.routing import RoutesPrefixIndex
+
+
+def make_patterns(routes_count):
+    patterns = []
+    for i in range(routes_count):
+        patterns.append(re.compile(rf'^/section{i}/(?P<id>[0-9]+)/?$'))
+        patterns.append(re.compile(rf'^/section{i}/?$'))
+    patterns.append(re.compile(r'^/'))
+    return patterns
+
+
+def linear_scan(patterns, url):
+    for pattern in patterns:
+        if pattern.match(url):
+            return pattern
+
+
+def indexed(patterns, index, url):
+    for i in index.get_candidates(url):
+        if patterns[i].match(url):
+            return patterns[i]
+
+
+def main():
+    routes_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    patterns = make_patterns(routes_count)
+    index = RoutesPrefixIndex(patterns)
+
+    urls = [f'/section{routes_count - 1}/123', f'/section{routes_count // 2}', '/section0/1', '/unknown/page']
+    number = 10000
+
+    for url in urls:
+        assert linear_scan(patterns, url) is indexed(patterns, index, url)
+
+        linear_time = timeit.timeit(lambda: linear_scan(patterns, url), number=number)
+        indexed_time = timeit.timeit(lambda: indexed(patterns, index, url), number=number)
+
+        print(f'{url:<24} linear: {linear_time / number * 1e6:8.2f}us  indexed: {indexed_time / number * 1e6:8.2f}us')
+
+
+if __name__ == '__main__':
+    main()
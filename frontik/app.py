@@ -1,5 +1,6 @@
 import asyncio
 import importlib
+import math
 import socket
 import sys
 import time
@@ -11,25 +12,40 @@ import logging
 import pycurl
 import tornado
 from lxml import etree
+from tornado import gen
 from tornado.options import options
 from tornado.httpclient import AsyncHTTPClient
 from tornado.stack_context import StackContext
-from tornado.web import Application, RequestHandler
+from tornado.web import Application, HTTPError, RequestHandler
 from http_client import HttpClientFactory
 
 import frontik.producers.json_producer
 import frontik.producers.xml_producer
-from frontik import integrations, media_types, request_context
+from frontik import integrations, loop_monitoring, media_types, request_context
 from frontik.debug import DebugTransform
-from frontik.handler import ErrorHandler
-from frontik.loggers import CUSTOM_JSON_EXTRA, JSON_REQUESTS_LOGGER
+from frontik.handler import OUTER_TIMEOUT_MS_HEADER, ErrorHandler, PageHandler
+from frontik.handler_active_limit import init_adaptive_limit
+from frontik.handlers_queue import HandlersQueue
+from frontik.http_batching import HttpRequestBatcher
+from frontik.http_cache import HttpResponseCache
+from frontik.http_coalescing import HttpRequestCoalescer
+from frontik.loggers import CUSTOM_JSON_EXTRA, JSON_REQUESTS_LOGGER, get_log_writer_stats
+from frontik.loop_monitoring import LoopLagProbe
+from frontik.process import get_worker_id
+from frontik.profiler import SamplingProfiler
 from frontik.routing import FileMappingRouter, FrontikRouter
 from frontik.service_discovery import get_async_service_discovery
 from frontik.version import version as frontik_version
+from frontik.worker_metrics import WorkerMetricsUpdater
 
 
 app_logger = logging.getLogger('http_client')
 
+# requests to these paths are never queued or rejected by handlers queue
+SERVICE_PATHS = frozenset(('/status', '/status/', '/version', '/version/', '/profiler', '/profiler/'))
+
+PROFILER_MAX_DURATION_SEC = 60
+
 if TYPE_CHECKING:
     from typing import Optional
 
@@ -68,6 +84,43 @@ class StatusHandler(RequestHandler):
         self.finish(self.application.get_current_status())
 
 
+class ProfilerHandler(PageHandler):
+    def get_page(self):
+        self.require_debug_access()
+
+        duration = min(self._get_positive_float_argument('duration', 10), PROFILER_MAX_DURATION_SEC)
+        interval_ms = max(self._get_positive_float_argument('interval_ms', 5), 1)
+
+        profiler = SamplingProfiler(interval_ms / 1000)
+
+        try:
+            profiler.start()
+        except RuntimeError:
+            raise HTTPError(409)
+
+        # profiling request does not take a slot of active handlers while it waits
+        self.active_limit.release()
+
+        try:
+            yield gen.sleep(duration)
+        finally:
+            profiler.stop()
+
+        self.set_header('Content-Type', media_types.TEXT_PLAIN)
+        self.text = profiler.get_collapsed_stacks()
+
+    def _get_positive_float_argument(self, name, default):
+        try:
+            value = float(self.get_argument(name, str(default)))
+        except ValueError:
+            value = None
+
+        if value is None or not math.isfinite(value) or value <= 0:
+            raise HTTPError(400, f'{name} must be a positive number')
+
+        return value
+
+
 class PydevdHandler(RequestHandler):
     def get(self):
         if hasattr(sys, 'gettrace') and sys.gettrace() is not None:
@@ -118,6 +171,8 @@ class FrontikApplication(Application):
         self.app_module = settings.get('app_module')
         self.app_root = settings.get('app_root')
 
+        request_context.set_mode(options.request_context_mode)
+
         self.xml = frontik.producers.xml_producer.XMLProducerFactory(self)
         self.json = frontik.producers.json_producer.JsonProducerFactory(self)
 
@@ -129,12 +184,22 @@ class FrontikApplication(Application):
 
         self.service_discovery_client = None
         self.http_client_factory = None
+        self.shared_http_client = None
+        self.http_request_coalescer = None
+        self.http_request_batcher = None
+        self.http_response_cache = None
+        self.handlers_queue = None
+        self.loop_lag_probe = None
+        self.shared_metrics = None
+        self.worker_metrics_updater = None
+        self.requests_count = 0
 
         self.router = FrontikRouter(self)
 
         core_handlers = [
             (r'/version/?', VersionHandler),
             (r'/status/?', StatusHandler),
+            (r'/profiler/?', ProfilerHandler),
             (r'.*', self.router),
         ]
 
@@ -149,6 +214,7 @@ class FrontikApplication(Application):
 
     async def init(self):
         self.transforms.insert(0, partial(DebugTransform, self))
+        self.xml.init_executor()
 
         self.available_integrations, integration_futures = integrations.load_integrations(self)
         await asyncio.gather(*[future for future in integration_futures if future])
@@ -169,21 +235,64 @@ class FrontikApplication(Application):
         self.http_client_factory = HttpClientFactory(self.app, self.tornado_http_client,
                                                      getattr(self.config, 'http_upstreams', {}),
                                                      statsd_client=self.statsd_client, kafka_producer=kafka_producer)
+        self.shared_http_client = self.http_client_factory.get_http_client(self.modify_shared_http_client_request)
+        self.http_request_coalescer = HttpRequestCoalescer(self.statsd_client)
+        self.http_request_batcher = HttpRequestBatcher(self.statsd_client)
+
+        if options.http_client_response_cache_size:
+            self.http_response_cache = HttpResponseCache(options.http_client_response_cache_size, self.statsd_client)
+
+        if options.loop_lag_probe_interval_ms:
+            self.loop_lag_probe = LoopLagProbe(options.loop_lag_probe_interval_ms, self.statsd_client)
+            self.loop_lag_probe.start()
+
+        worker_id = get_worker_id()
+        if self.shared_metrics is not None and worker_id is not None:
+            self.worker_metrics_updater = WorkerMetricsUpdater(self.shared_metrics, worker_id, self)
+            self.worker_metrics_updater.start()
+
+        init_adaptive_limit(self.statsd_client)
+
+        if options.handlers_queue_size:
+            self.handlers_queue = HandlersQueue(
+                options.handlers_queue_size, options.handlers_queue_target_delay_ms, options.handlers_queue_timeout_ms,
+                self.statsd_client
+            )
 
     def find_handler(self, request, **kwargs):
+        self.requests_count += 1
+
+        handlers_queue = self.handlers_queue if request.path not in SERVICE_PATHS else None
+        if handlers_queue is not None and handlers_queue.is_full():
+            return handlers_queue.reject(request)
+
         request_id = request.headers.get('X-Request-Id')
         if request_id is None:
             request_id = FrontikApplication.next_request_id()
 
-        context = partial(request_context.RequestContext, {'request': request, 'request_id': request_id})
+        if request_context.is_stack_context_enabled():
+            context = partial(request_context.RequestContext, {'request': request, 'request_id': request_id})
+        else:
+            context = None
+
+        # one context is shared by all callbacks of the request, so handler name is kept in on_connection_close
+        request_contextvars = request_context.create_context(request, request_id)
 
         def wrapped_in_context(func):
             def wrapper(*args, **kwargs):
-                token = request_context.initialize(request, request_id)
+                token = request_context.set_context(request_contextvars)
 
                 try:
+                    if loop_monitoring.is_enabled():
+                        call, args = loop_monitoring.call_with_loop_time, (func,) + args
+                    else:
+                        call = func
+
+                    if context is None:
+                        return call(*args, **kwargs)
+
                     with StackContext(context):
-                        return func(*args, **kwargs)
+                        return call(*args, **kwargs)
                 finally:
                     request_context.reset(token)
 
@@ -195,6 +304,9 @@ class FrontikApplication(Application):
         delegate.finish = wrapped_in_context(delegate.finish)
         delegate.on_connection_close = wrapped_in_context(delegate.on_connection_close)
 
+        if handlers_queue is not None:
+            delegate = handlers_queue.wrap(request, delegate)
+
         return delegate
 
     def reverse_url(self, name, *args, **kwargs):
@@ -219,6 +331,11 @@ class FrontikApplication(Application):
     def application_version(self):
         return None
 
+    def modify_shared_http_client_request(self, balanced_request):
+        """Requests shared between handlers get their own request id instead of the id of the first handler"""
+        balanced_request.headers['x-request-id'] = FrontikApplication.next_request_id()
+        balanced_request.headers[OUTER_TIMEOUT_MS_HEADER] = f'{balanced_request.request_timeout * 1000:.0f}'
+
     @staticmethod
     def next_request_id():
         FrontikApplication.request_id += 1
@@ -239,7 +356,13 @@ class FrontikApplication(Application):
             'workers': {
                 'total': len(self.http_client_factory.tornado_http_client._curls),
                 'free': len(self.http_client_factory.tornado_http_client._free_list)
-            }
+            },
+            'file_caches': self.xml.get_cache_stats(),
+            'xsl_cache_warmup': self.xml.xsl_cache_warmup_stats,
+            'http_response_cache': self.http_response_cache.get_stats() if self.http_response_cache else None,
+            'handlers_queue': self.handlers_queue.get_stats() if self.handlers_queue else None,
+            'ioloop_lag_ms': self.loop_lag_probe.get_stats() if self.loop_lag_probe else None,
+            'log_writer': get_log_writer_stats(),
         }
 
     def log_request(self, handler):
@@ -1,7 +1,15 @@
+import os
+import re
+
 import lxml.etree as etree
 
 from tornado.concurrent import Future
 
+from frontik.xml_util import CachedXmlFragment
+
+_FRAGMENT_MARKER = f'frontik-cached-xml-{os.urandom(8).hex()}-'
+_FRAGMENT_PLACEHOLDER_RE = re.compile(b'<!--' + _FRAGMENT_MARKER.encode() + rb'(\d+)-->')
+
 
 def _is_valid_element(node):
     if not isinstance(node, etree._Element):
@@ -41,7 +49,13 @@ class Doc:
         self.data = []
 
     def to_etree_element(self):
-        res = self.root_node.to_etree_element() if isinstance(self.root_node, Doc) else self.root_node
+        return self._to_etree_element(None)
+
+    def _to_etree_element(self, fragments):
+        if isinstance(self.root_node, Doc):
+            res = self.root_node._to_etree_element(fragments)
+        else:
+            res = self.root_node
 
         def chunk_to_element(chunk):
             if isinstance(chunk, list):
@@ -49,6 +63,15 @@ class Doc:
                     for i in chunk_to_element(chunk_i):
                         yield i
 
+            elif isinstance(chunk, Doc):
+                yield chunk._to_etree_element(fragments)
+
+            elif fragments is not None and isinstance(chunk, CachedXmlFragment) and not chunk.is_copied():
+                # unmodified shared fragment is replaced with its serialized bytes in to_string
+                placeholder = etree.Comment(f'{_FRAGMENT_MARKER}{len(fragments)}')
+                fragments.append((placeholder, chunk))
+                yield placeholder
+
             elif hasattr(chunk, 'to_etree_element'):
                 etree_element = chunk.to_etree_element()
                 if etree_element is not None:
@@ -71,4 +94,16 @@ class Doc:
         return res
 
     def to_string(self):
-        return etree.tostring(self.to_etree_element(), encoding='utf-8', xml_declaration=True)
+        fragments = []
+        element = self._to_etree_element(fragments)
+
+        try:
+            result = etree.tostring(element, encoding='utf-8', xml_declaration=True)
+        finally:
+            for placeholder, _ in fragments:
+                placeholder.getparent().remove(placeholder)
+
+        if not fragments:
+            return result
+
+        return _FRAGMENT_PLACEHOLDER_RE.sub(lambda match: fragments[int(match.group(1))][1].to_bytes(), result)
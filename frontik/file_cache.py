@@ -1,39 +1,108 @@
 import copy
 import os
+from collections import OrderedDict
+from itertools import chain
 
 import tornado.options
 
+_MISSING = object()
+
+
+class LimitedDict:
+    """
+    Mapping with O(1) lookups, insertions and evictions.
+
+    When `max_len` is None, the dict is unlimited and never reorders its items.
+    Otherwise it is an LRU cache, or a segmented LRU cache if `step` is set:
+    new items are placed in a probationary segment of `step` items, and are promoted
+    to the protected segment on the first hit. Protected items are demoted back
+    to the probationary segment when it overflows, so an item has to be requested
+    at least twice to survive a burst of one-off loads.
+    """
 
-# This implementation is broken in so many ways
-class LimitedDict(dict):
     def __init__(self, max_len=None, step=None, deepcopy=False):
-        dict.__init__(self)
-        self._order = []
         self.max_len = max_len
         self.step = step
         self.deepcopy = deepcopy
 
+        self._segmented = max_len is not None and bool(step)
+        self._protected_len = max(max_len - step, 0) if self._segmented else 0
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._probation) + len(self._protected)
+
+    def __contains__(self, key):
+        return key in self._probation or key in self._protected
+
+    def __iter__(self):
+        return chain(self._probation, self._protected)
+
     def __getitem__(self, key):
-        val = dict.__getitem__(self, key)
-        if self.max_len is not None:
-            if self.step:
-                ind = self._order.index(key)
-                self._order.remove(key)
-                self._order.insert(ind + self.step, key)
-            else:
-                self._order.remove(key)
-                self._order.append(key)
-        return copy.deepcopy(val) if self.deepcopy else val
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
 
     def __setitem__(self, key, value):
-        dict.__setitem__(self, key, value)
+        if key in self._protected:
+            self._protected[key] = value
+            self._protected.move_to_end(key)
+            return
+
+        self._probation[key] = value
+        self._probation.move_to_end(key)
+
         if self.max_len is not None:
-            if self.step:
-                self._order.insert(self.step, key)
-            else:
-                self._order.append(key)
-        if self.max_len is not None and len(self._order) > self.max_len:
-            self.pop(self._order.pop(0))
+            while len(self) > self.max_len:
+                self._evict()
+
+    def clear(self):
+        self._probation.clear()
+        self._protected.clear()
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return copy.deepcopy(value) if self.deepcopy else value
+
+    def _lookup(self, key):
+        value = self._protected.get(key, _MISSING)
+        if value is not _MISSING:
+            self._protected.move_to_end(key)
+            return value
+
+        value = self._probation.get(key, _MISSING)
+        if value is _MISSING or self.max_len is None:
+            return value
+
+        if not self._segmented:
+            self._probation.move_to_end(key)
+            return value
+
+        del self._probation[key]
+        self._protected[key] = value
+
+        while len(self._protected) > self._protected_len:
+            demoted_key, demoted_value = self._protected.popitem(last=False)
+            self._probation[demoted_key] = demoted_value
+
+        return value
+
+    def _evict(self):
+        segment = self._probation if self._probation else self._protected
+        segment.popitem(last=False)
+        self.evictions += 1
 
 
 class FileCache:
@@ -48,25 +117,43 @@ class FileCache:
         self.max_len = max_len
         self.cache = LimitedDict(max_len, step, deepcopy)
 
-    def populate(self, filenames, log, freeze=False):
+    def populate(self, filenames, log, freeze=False, skip_errors=False):
+        """Loads files into cache, returns the number of successfully loaded files"""
         if self.max_len == 0:
-            return
+            return 0
 
+        loaded = 0
         for filename in filenames:
-            self._load(filename, log)
+            try:
+                self._load(filename, log)
+                loaded += 1
+            except Exception:
+                if not skip_errors:
+                    raise
+                log.exception('failed to load %s file into %s cache', filename, self.cache_name)
 
         self.frozen = freeze and self.max_len is None
+        return loaded
 
     def load(self, filename, log):
-        if filename in self.cache:
+        result = self.cache.get(filename, _MISSING)
+        if result is not _MISSING:
             log.debug('got %s file from cache (%s cache size: %s)', filename, self.cache_name, len(self.cache))
-            return self.cache[filename]
+            return result
 
         if self.frozen:
             raise Exception(f'encounter file {filename} not in cache while cache is frozen')
 
         return self._load(filename, log)
 
+    def get_stats(self):
+        return {
+            'size': len(self.cache),
+            'hits': self.cache.hits,
+            'misses': self.cache.misses,
+            'evictions': self.cache.evictions,
+        }
+
     def _load(self, filename, log):
         real_filename = os.path.normpath(os.path.join(self.root_dir, filename))
         log.info('reading file "%s"', real_filename)
@@ -83,6 +170,9 @@ class InvalidOptionCache:
     def load(self, filename, *args, **kwargs):
         raise Exception(f'{self.option} option is undefined')
 
+    def get_stats(self):
+        return None
+
 
 def make_file_cache(cache_name, option_name, root_dir, fun, max_len=None, step=None, deepcopy=False):
     if root_dir:
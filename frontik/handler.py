@@ -1,4 +1,6 @@
+import asyncio
 import http.client
+import inspect
 import json
 import logging
 import re
@@ -24,10 +26,13 @@ import frontik.util
 from frontik import media_types, request_context
 from frontik.auth import DEBUG_AUTH_HEADER_NAME
 from frontik.futures import AbortAsyncGroup, AsyncGroup
+from frontik.http_batching import extract_by_key
+from frontik.http_coalescing import make_request_key
 from frontik.debug import DEBUG_HEADER_NAME, DebugMode
 from frontik.timeout_tracking import get_timeout_checker
+from frontik.loggers import get_hot_path_logger
 from frontik.loggers.stages import StagesLogger
-from frontik.preprocessors import _get_preprocessors, _unwrap_preprocessors
+from frontik.preprocessors import _get_preprocessors, _get_preprocessors_dependencies, _unwrap_preprocessors
 from frontik.util import make_url
 from frontik.version import version as frontik_version
 
@@ -39,6 +44,25 @@ def _fallback_status_code(status_code):
     return status_code if status_code in http.client.responses else http.client.SERVICE_UNAVAILABLE
 
 
+def _call_handler_method(method, *args):
+    """
+    Calls page method or preprocessor, returns an awaitable if the method has not completed synchronously.
+    Generator-based methods are run with `gen.coroutine` for backwards compatibility. Futures returned
+    by plain functions are not awaited, the same way as with `gen.coroutine`.
+    """
+    if inspect.isgeneratorfunction(method):
+        return gen.coroutine(method)(*args)
+
+    result = method(*args)
+    if inspect.iscoroutine(result):
+        return result
+
+    return None
+
+
+PAGE_METHOD_NAMES = ('get_page', 'post_page', 'put_page', 'delete_page')
+
+
 class FinishWithPostprocessors(Exception):
     def __init__(self, wait_finish_group=False):
         self.wait_finish_group = wait_finish_group
@@ -57,7 +81,7 @@ _ARG_DEFAULT = object()
 MEDIA_TYPE_PARAMETERS_SEPARATOR_RE = r' *; *'
 OUTER_TIMEOUT_MS_HEADER = 'X-Outer-Timeout-Ms'
 
-handler_logger = logging.getLogger('handler')
+handler_logger = get_hot_path_logger('handler')
 
 
 def _fail_fast_policy(fail_fast, waited, host, uri):
@@ -75,6 +99,17 @@ class PageHandler(RequestHandler):
 
     preprocessors = ()
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # dependencies of preprocessors are checked when the page class is defined instead of request time
+        for method_name in PAGE_METHOD_NAMES:
+            page_method = getattr(cls, method_name, None)
+            if page_method is not None:
+                _get_preprocessors_dependencies(
+                    _unwrap_preprocessors(cls.preprocessors) + _get_preprocessors(page_method)
+                )
+
     def __init__(self, application, request, **kwargs):
         self.name = self.__class__.__name__
         self.request_id = request.request_id = request_context.get_request_id()
@@ -100,6 +135,7 @@ class PageHandler(RequestHandler):
         self._mandatory_headers = tornado.httputil.HTTPHeaders()
 
         self.timeout_checker = None
+        self._outer_timeout = None
 
         outer_timeout = request.headers.get(OUTER_TIMEOUT_MS_HEADER)
         if outer_timeout:
@@ -111,7 +147,9 @@ class PageHandler(RequestHandler):
         return '.'.join([self.__module__, self.__class__.__name__])
 
     def prepare(self):
-        self.active_limit = frontik.handler_active_limit.ActiveHandlersLimit(self.statsd_client)
+        self.active_limit = frontik.handler_active_limit.ActiveHandlersLimit(
+            self.application.statsd_client, frontik.handler_active_limit.is_low_priority(self)
+        )
         self.debug_mode = DebugMode(self)
         self.finish_group = AsyncGroup(lambda: None, name='finish')
 
@@ -127,8 +165,39 @@ class PageHandler(RequestHandler):
 
         self._handler_finished_notification = self.finish_group.add_notification()
 
+        if self.timeout_checker is not None and options.outer_timeout_enforcement:
+            self._start_outer_timeout_enforcement()
+
         super().prepare()
 
+    def _start_outer_timeout_enforcement(self):
+        remaining_time_ms = self.timeout_checker.get_remaining_time_ms()
+
+        if remaining_time_ms <= 0:
+            self.log.warning(
+                'outer timeout of %.0f ms is already exceeded, dropping request', self.timeout_checker.outer_timeout_ms
+            )
+            raise tornado.web.HTTPError(503)
+
+        self._outer_timeout = self.add_timeout(
+            IOLoop.current().time() + remaining_time_ms / 1000, self._on_outer_timeout
+        )
+
+    def _on_outer_timeout(self):
+        self._outer_timeout = None
+
+        if self.is_finished():
+            return
+
+        self.log.warning(
+            'outer timeout of %.0f ms is exceeded, aborting page', self.timeout_checker.outer_timeout_ms
+        )
+
+        self.send_error(504)
+
+        if not self.finish_group.is_finished():
+            self.finish_group.abort()
+
     def require_debug_access(self, login=None, passwd=None):
         if self._debug_access is None:
             if options.debug:
@@ -225,34 +294,52 @@ class PageHandler(RequestHandler):
         with stack_context.ExceptionStackContext(self._stack_context_handle_exception):
             return super()._execute(transforms, *args, **kwargs)
 
-    @gen.coroutine
     def get(self, *args, **kwargs):
-        yield self._execute_page(self.get_page)
+        return self._execute_page(self.get_page)
 
-    @gen.coroutine
     def post(self, *args, **kwargs):
-        yield self._execute_page(self.post_page)
+        return self._execute_page(self.post_page)
 
-    @gen.coroutine
     def head(self, *args, **kwargs):
-        yield self._execute_page(self.get_page)
+        return self._execute_page(self.get_page)
 
-    @gen.coroutine
     def delete(self, *args, **kwargs):
-        yield self._execute_page(self.delete_page)
+        return self._execute_page(self.delete_page)
 
-    @gen.coroutine
     def put(self, *args, **kwargs):
-        yield self._execute_page(self.put_page)
+        return self._execute_page(self.put_page)
 
     def options(self, *args, **kwargs):
         self.__return_405()
 
-    @gen.coroutine
     def _execute_page(self, page_handler_method):
-        self.stages_logger.commit_stage('prepare')
+        if getattr(self, 'native_page_execution', options.native_page_execution):
+            return self._execute_page_native(page_handler_method)
+
+        return self._execute_page_coroutine(page_handler_method)
+
+    async def _execute_page_native(self, page_handler_method):
+        """
+        Executes preprocessors and page method without wrapping them in `gen.coroutine`:
+        plain functions are called directly, native coroutines are awaited and only legacy
+        generator-based functions are run with `gen.coroutine`.
+        """
+        preprocessors = self._get_page_preprocessors(page_handler_method)
+        preprocessors_completed = await self._run_preprocessors_native(preprocessors)
+
+        if not preprocessors_completed:
+            self.log.info('page was already finished, skipping page method')
+            return
+
+        result = _call_handler_method(page_handler_method)
+        if result is not None:
+            await result
+
+        await self._finish_page()
 
-        preprocessors = _unwrap_preprocessors(self.preprocessors) + _get_preprocessors(page_handler_method.__func__)
+    @gen.coroutine
+    def _execute_page_coroutine(self, page_handler_method):
+        preprocessors = self._get_page_preprocessors(page_handler_method)
         preprocessors_completed = yield self._run_preprocessors(preprocessors)
 
         if not preprocessors_completed:
@@ -261,6 +348,14 @@ class PageHandler(RequestHandler):
 
         yield gen.coroutine(page_handler_method)()
 
+        yield self._finish_page()
+
+    def _get_page_preprocessors(self, page_handler_method):
+        self.stages_logger.commit_stage('prepare')
+        return _unwrap_preprocessors(self.preprocessors) + _get_preprocessors(page_handler_method.__func__)
+
+    @gen.coroutine
+    def _finish_page(self):
         self._handler_finished_notification()
         yield self.finish_group.get_finish_future()
 
@@ -329,6 +424,9 @@ class PageHandler(RequestHandler):
         def _cb(future):
             if future.result() is not None:
                 self.finish(future.result())
+            elif self._headers_written and not self._finished:
+                # streaming producer has already flushed the response, it must be terminated
+                self.finish()
 
         self.add_future(self._postprocess(), _cb)
 
@@ -476,14 +574,30 @@ class PageHandler(RequestHandler):
         if hasattr(self, 'active_limit'):
             self.active_limit.release()
 
-    def finish(self, chunk=None):
-        self.stages_logger.commit_stage('postprocess')
+            if self.application.handlers_queue is not None:
+                self.application.handlers_queue.process()
+
+        if self._outer_timeout is not None:
+            self.remove_timeout(self._outer_timeout)
+            self._outer_timeout = None
+
+    def _set_mandatory_headers_and_cookies(self):
         for name, value in self._mandatory_headers.items():
             self.set_header(name, value)
 
         for args, kwargs in self._mandatory_cookies.values():
             self.set_cookie(*args, **kwargs)
 
+    def flush(self, include_footers=False, callback=None):
+        if not self._headers_written:
+            self._set_mandatory_headers_and_cookies()
+
+        return super().flush(include_footers, callback)
+
+    def finish(self, chunk=None):
+        self.stages_logger.commit_stage('postprocess')
+        self._set_mandatory_headers_and_cookies()
+
         if self._status_code in (204, 304) or (100 <= self._status_code < 200):
             self._write_buffer = []
             chunk = None
@@ -520,12 +634,23 @@ class PageHandler(RequestHandler):
 
     @gen.coroutine
     def _run_preprocessors(self, preprocessors):
-        for p in preprocessors:
-            yield gen.coroutine(p)(self)
-            if self._finished:
-                self.log.info('page was already finished, breaking preprocessors chain')
+        dependencies = _get_preprocessors_dependencies(preprocessors)
+
+        if dependencies is not None:
+            preprocessors_completed = yield self._run_preprocessors_graph(
+                preprocessors, dependencies, lambda p: gen.coroutine(p)(self)
+            )
+
+            if not preprocessors_completed:
                 return False
 
+        else:
+            for p in preprocessors:
+                yield gen.coroutine(p)(self)
+                if self._finished:
+                    self.log.info('page was already finished, breaking preprocessors chain')
+                    return False
+
         yield gen.multi(self._preprocessor_futures)
 
         self._preprocessor_futures = None
@@ -536,6 +661,100 @@ class PageHandler(RequestHandler):
 
         return True
 
+    async def _run_preprocessors_native(self, preprocessors):
+        dependencies = _get_preprocessors_dependencies(preprocessors)
+
+        if dependencies is not None:
+            preprocessors_completed = await self._run_preprocessors_graph(
+                preprocessors, dependencies, lambda p: _call_handler_method(p, self)
+            )
+
+            if not preprocessors_completed:
+                return False
+
+        else:
+            for p in preprocessors:
+                result = _call_handler_method(p, self)
+                if result is not None:
+                    await result
+
+                if self._finished:
+                    self.log.info('page was already finished, breaking preprocessors chain')
+                    return False
+
+        if self._preprocessor_futures:
+            await gen.multi(self._preprocessor_futures)
+
+        self._preprocessor_futures = None
+
+        if self._finished:
+            self.log.info('page was already finished, breaking preprocessors chain')
+            return False
+
+        return True
+
+    @gen.coroutine
+    def _run_preprocessors_graph(self, preprocessors, dependencies, call_preprocessor):
+        """
+        Runs each preprocessor as soon as all its dependencies are completed, so independent preprocessors
+        are run concurrently. New preprocessors are not started after the page is finished.
+        """
+        pending = list(range(len(preprocessors)))
+        completed = set()
+        running = {}
+
+        try:
+            while pending or running:
+                ready = [i for i in pending if dependencies[i] <= completed]
+
+                for i in ready:
+                    pending.remove(i)
+                    result = call_preprocessor(preprocessors[i])
+
+                    if result is None:
+                        completed.add(i)
+                    else:
+                        running[gen.convert_yielded(result)] = i
+
+                    if self._finished:
+                        self.log.info('page was already finished, breaking preprocessors chain')
+                        return False
+
+                if not running:
+                    continue
+
+                done, _ = yield asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for future in done:
+                    completed.add(running.pop(future))
+                    future.result()
+
+                if self._finished:
+                    self.log.info('page was already finished, breaking preprocessors chain')
+                    return False
+
+            return True
+
+        finally:
+            if running:
+                yield self._stop_preprocessors({future: preprocessors[i] for future, i in running.items()})
+
+    @gen.coroutine
+    def _stop_preprocessors(self, running):
+        """Cancels native coroutines and waits for other preprocessors, which are left after the chain is broken"""
+        for future in running:
+            if isinstance(future, asyncio.Task):
+                future.cancel()
+
+        yield asyncio.wait(running)
+
+        for future in running:
+            if not future.cancelled() and future.exception() is not None:
+                self.log.warning(
+                    'preprocessor %s failed after preprocessors chain was broken', running[future].__name__,
+                    exc_info=future.exception()
+                )
+
     @gen.coroutine
     def _run_postprocessors(self, postprocessors):
         for p in postprocessors:
@@ -588,10 +807,13 @@ class PageHandler(RequestHandler):
     def modify_http_client_request(self, balanced_request: 'BalancedHttpRequest'):
         balanced_request.headers['x-request-id'] = request_context.get_request_id()
 
-        balanced_request.headers[OUTER_TIMEOUT_MS_HEADER] = f'{balanced_request.request_timeout * 1000:.0f}'
-
         if self.timeout_checker is not None:
-            self.timeout_checker.check(balanced_request)
+            if options.outer_timeout_enforcement:
+                self.timeout_checker.enforce(balanced_request)
+            else:
+                self.timeout_checker.check(balanced_request)
+
+        balanced_request.headers[OUTER_TIMEOUT_MS_HEADER] = f'{balanced_request.request_timeout * 1000:.0f}'
 
         if self.debug_mode.pass_debug:
             balanced_request.headers[DEBUG_HEADER_NAME] = 'true'
@@ -630,15 +852,51 @@ class PageHandler(RequestHandler):
 
     def get_url(self, host, uri, *, name=None, data=None, headers=None, follow_redirects=True,
                 connect_timeout=None, request_timeout=None, max_timeout_tries=None,
-                callback=None, waited=True, parse_response=True, parse_on_error=True, fail_fast=False):
+                callback=None, waited=True, parse_response=True, parse_on_error=True, fail_fast=False,
+                coalesce=None, cache=True):
 
         fail_fast = _fail_fast_policy(fail_fast, waited, host, uri)
 
-        client_method = lambda callback: self._http_client.get_url(
+        request_method = lambda http_client, callback: http_client.get_url(
             host, uri, name=name, data=data, headers=headers, follow_redirects=follow_redirects,
             connect_timeout=connect_timeout, request_timeout=request_timeout, max_timeout_tries=max_timeout_tries,
             callback=callback, parse_response=parse_response, parse_on_error=parse_on_error, fail_fast=fail_fast
         )
+        client_method = partial(request_method, self._http_client)
+
+        if coalesce is None:
+            coalesce = options.http_client_coalesce_requests
+
+        # coalesced request is sent by a client which does not depend on the handler, so requests of handlers
+        # with debug mode are never coalesced. Outer timeout is not applied to the shared request,
+        # with outer_timeout_enforcement every waiting handler is aborted on its own deadline
+        coalesce = coalesce and not self.debug_mode.enabled
+
+        # debug responses depend on debug headers of the current request, so they are never shared
+        cache = cache and self.application.http_response_cache is not None and not self.debug_mode.pass_debug
+
+        if coalesce or cache:
+            key = make_request_key(
+                host, uri, data, headers, follow_redirects, connect_timeout, request_timeout, max_timeout_tries,
+                parse_response, parse_on_error, fail_fast
+            )
+
+            if coalesce:
+                fetch_method = partial(
+                    self.application.http_request_coalescer.fetch, key, host,
+                    partial(request_method, self.application.shared_http_client, None)
+                )
+            else:
+                fetch_method = partial(client_method, None)
+
+            if cache:
+                shared_method = lambda callback: self.application.http_response_cache.fetch(
+                    key, host, fetch_method, callback
+                )
+            else:
+                shared_method = lambda callback: fetch_method(callback)
+
+            return self._execute_http_client_method(host, uri, shared_method, waited, callback)
 
         return self._execute_http_client_method(host, uri, client_method, waited, callback)
 
@@ -700,6 +958,41 @@ class PageHandler(RequestHandler):
 
         return self._execute_http_client_method(host, uri, client_method, waited, callback)
 
+    def batch_get(self, host, uri, key, *, param='id', separator=',', extract=None, headers=None,
+                  connect_timeout=None, request_timeout=None, max_timeout_tries=None,
+                  window_ms=None, max_batch_size=100, callback=None, waited=True):
+        """
+        Requests one item by `key` from an upstream supporting bulk GET requests.
+
+        Keys requested from the same `host`, `uri` and `param` during one IOLoop iteration
+        (or `window_ms`, if it is set) by any handlers are sent with one GET request
+        with `param` containing all keys joined with `separator`. By default bulk response must be
+        a JSON object with string keys, `extract(request_result, key)` can be passed to get item otherwise.
+
+        Returns a future resolved with `BatchItemResult` of the item, `callback(item, response)` is called
+        before it is resolved. The bulk request does not depend on the calling handler: it is sent with its own
+        request id and without outer timeout of the handler.
+        """
+
+        if window_ms is None:
+            window_ms = options.http_client_batch_window_ms
+
+        batch_key = make_request_key(
+            host, uri, None, headers, param, separator, connect_timeout, request_timeout, max_timeout_tries
+        )
+
+        def send_batch(keys):
+            return self.application.shared_http_client.get_url(
+                host, uri, data={param: separator.join(str(k) for k in keys)}, headers=headers,
+                connect_timeout=connect_timeout, request_timeout=request_timeout, max_timeout_tries=max_timeout_tries
+            )
+
+        batch_method = lambda callback: self.application.http_request_batcher.add(
+            batch_key, key, send_batch, extract or extract_by_key, callback, window_ms, max_batch_size
+        )
+
+        return self._execute_http_client_method(host, uri, batch_method, waited, callback)
+
     def _execute_http_client_method(self, host, uri, client_method, waited, callback):
         if waited and (self.is_finished() or self.finish_group.is_finished()):
             handler_logger.info(
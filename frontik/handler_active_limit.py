@@ -1,43 +1,161 @@
 import logging
+import time
 
 from tornado.options import options
 from tornado.web import HTTPError
 
 handlers_count_logger = logging.getLogger('handlers_count')
 
+LOW_PRIORITY_HEADER = 'X-Request-Priority'
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit based on handlers latency.
+
+    Latencies are collected during a sampling window of `window_ms` (at least `min_window_samples` samples).
+    At the end of the window the limit is multiplied by `backoff_ratio` once if 90th percentile of latencies
+    is higher than `target_latency_ms`, otherwise it is increased by one if at least half of the limit was in use.
+    The limit is kept between `min_limit` and `max_limit`.
+
+    The limit and 90th percentile of latencies are sent to `statsd_client` at the end of each window.
+    """
+
+    def __init__(self, min_limit, max_limit, target_latency_ms, backoff_ratio=0.9, window_ms=None,
+                 min_window_samples=10, statsd_client=None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency_ms = target_latency_ms
+        self.backoff_ratio = backoff_ratio
+        self.window = (window_ms if window_ms is not None else target_latency_ms) / 1000
+        self.min_window_samples = min_window_samples
+        self._statsd_client = statsd_client
+        self._limit = float(max_limit)
+
+        self._window_start = None
+        self._window_latencies = []
+        self._window_max_in_flight = 0
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def on_sample(self, latency_ms, in_flight, now=None):
+        now = time.time() if now is None else now
+
+        if self._window_start is None:
+            self._window_start = now
+
+        self._window_latencies.append(latency_ms)
+        self._window_max_in_flight = max(self._window_max_in_flight, in_flight)
+
+        if now - self._window_start >= self.window and len(self._window_latencies) >= self.min_window_samples:
+            self._update_limit()
+            self._window_start = now
+            self._window_latencies = []
+            self._window_max_in_flight = 0
+
+    def _update_limit(self):
+        latencies = sorted(self._window_latencies)
+        p90_latency_ms = latencies[int(len(latencies) * 0.9)]
+
+        if p90_latency_ms > self.target_latency_ms:
+            self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+        elif self._window_max_in_flight * 2 >= self._limit:
+            self._limit = min(self._limit + 1, self.max_limit)
+
+        if self._statsd_client is not None:
+            self._statsd_client.gauge('handler.active_limit', self.limit)
+            self._statsd_client.gauge('handler.active_limit.p90_latency_ms', p90_latency_ms)
+
+
+_adaptive_limit = None
+
+
+def init_adaptive_limit(statsd_client):
+    """Is called on application init, metrics of the limit are sent with application `statsd_client`"""
+    global _adaptive_limit
+
+    if options.adaptive_handlers_limit:
+        _adaptive_limit = AdaptiveLimit(
+            options.min_active_handlers, options.max_active_handlers, options.adaptive_handlers_limit_latency_ms,
+            statsd_client=statsd_client
+        )
+        statsd_client.gauge('handler.active_limit', _adaptive_limit.limit)
+
+    return _adaptive_limit
+
+
+def get_adaptive_limit():
+    return _adaptive_limit
+
+
+def get_active_handlers_limit():
+    adaptive_limit = get_adaptive_limit()
+    return adaptive_limit.limit if adaptive_limit is not None else options.max_active_handlers
+
+
+def is_low_priority(handler):
+    return getattr(handler, 'low_priority', False) or handler.request.headers.get(LOW_PRIORITY_HEADER) == 'low'
+
 
 class ActiveHandlersLimit:
     count = 0
     high_watermark_ratio = 0.75
 
-    def __init__(self, statsd_client):
+    def __init__(self, statsd_client, low_priority=False):
         self._acquired = False
+        self._acquire_time = None
         self._statsd_client = statsd_client
-        self._high_watermark = int(options.max_active_handlers * self.high_watermark_ratio)
+        self._adaptive_limit = get_adaptive_limit()
 
-        if ActiveHandlersLimit.count > options.max_active_handlers:
+        limit = get_active_handlers_limit()
+        self._high_watermark = int(limit * self.high_watermark_ratio)
+
+        if ActiveHandlersLimit.count > limit:
             handlers_count_logger.warning(
                 'dropping request: too many active handlers (%s)', ActiveHandlersLimit.count
             )
 
-            raise HTTPError(503)
+            self._drop('active_limit', limit)
 
         elif ActiveHandlersLimit.count > self._high_watermark:
+            if low_priority:
+                handlers_count_logger.warning(
+                    'dropping low priority request: active handlers count reached %.2f * %s watermark (%s)',
+                    self.high_watermark_ratio, limit, ActiveHandlersLimit.count
+                )
+
+                self._drop('low_priority', limit)
+
             handlers_count_logger.warning(
                 'active handlers count reached %.2f * %s watermark (%s)',
-                self.high_watermark_ratio, options.max_active_handlers, ActiveHandlersLimit.count
+                self.high_watermark_ratio, limit, ActiveHandlersLimit.count
             )
 
         self.acquire()
 
+    def _drop(self, reason, limit):
+        self._statsd_client.count('handler.rejected', 1, reason=reason)
+        self._statsd_client.gauge('handler.active_count', ActiveHandlersLimit.count)
+        if self._adaptive_limit is not None:
+            self._statsd_client.gauge('handler.active_limit', limit)
+
+        raise HTTPError(503)
+
     def acquire(self):
         if not self._acquired:
             ActiveHandlersLimit.count += 1
             self._acquired = True
+            self._acquire_time = time.time()
             self._statsd_client.gauge('handler.active_count', ActiveHandlersLimit.count)
 
     def release(self):
         if self._acquired:
+            if self._adaptive_limit is not None:
+                latency_ms = (time.time() - self._acquire_time) * 1000
+                self._adaptive_limit.on_sample(latency_ms, ActiveHandlersLimit.count)
+
             ActiveHandlersLimit.count -= 1
             self._acquired = False
             self._statsd_client.gauge('handler.active_count', ActiveHandlersLimit.count)
@@ -0,0 +1,196 @@
+import logging
+import time
+from collections import deque
+
+from tornado import httputil, stack_context
+from tornado.ioloop import IOLoop
+
+from frontik.handler_active_limit import ActiveHandlersLimit, get_active_handlers_limit
+
+handlers_queue_logger = logging.getLogger('handlers_queue')
+
+REJECTED_LOG_INTERVAL_SEC = 1
+
+
+def send_service_unavailable(request):
+    request.connection.write_headers(
+        httputil.ResponseStartLine(request.version, 503, 'Service Unavailable'),
+        httputil.HTTPHeaders({'Content-Length': '0'})
+    )
+    request.connection.finish()
+
+
+class RejectedRequestDelegate(httputil.HTTPMessageDelegate):
+    """Reads the request and responds with 503 without creating a handler"""
+
+    def __init__(self, request):
+        self.request = request
+
+    def finish(self):
+        send_service_unavailable(self.request)
+
+
+class QueuedRequestDelegate(httputil.HTTPMessageDelegate):
+    """Defers execution of the handler until the request is taken from the queue"""
+
+    def __init__(self, queue, request, delegate):
+        self.queue = queue
+        self.request = request
+        self.delegate = delegate
+        self.enqueue_time = None
+        self.deadline = None
+        self.closed = False
+
+    def headers_received(self, start_line, headers):
+        return self.delegate.headers_received(start_line, headers)
+
+    def data_received(self, chunk):
+        return self.delegate.data_received(chunk)
+
+    def finish(self):
+        self.queue.enqueue(self)
+
+    def on_connection_close(self):
+        self.closed = True
+        self.delegate.on_connection_close()
+
+
+class HandlersQueue:
+    """
+    Bounded queue of requests waiting for a free slot of active handlers limit.
+
+    Requests are rejected before routing when the queue is full. Queued requests are dropped
+    after `timeout_ms` or, when the queue has not been empty for `timeout_ms` (standing queue),
+    after `target_delay_ms`. While the queue is standing, newest requests are served first (adaptive LIFO),
+    because the oldest ones are likely to be timed out by clients anyway.
+    """
+
+    def __init__(self, max_size, target_delay_ms, timeout_ms, statsd_client):
+        self.max_size = max_size
+        self.target_delay = target_delay_ms / 1000
+        self.timeout = timeout_ms / 1000
+        self._statsd_client = statsd_client
+
+        self._queue = deque()
+        self._dispatched = 0
+        self._last_empty_time = time.time()
+        self._timer = None
+
+        self.queued = 0
+        self.rejected = 0
+        self._last_rejected_log_time = 0
+        self._rejected_since_log = 0
+
+    def has_free_slot(self):
+        return ActiveHandlersLimit.count + self._dispatched < get_active_handlers_limit()
+
+    def is_full(self):
+        return len(self._queue) >= self.max_size and not self.has_free_slot()
+
+    def is_standing(self, now):
+        return bool(self._queue) and now - self._last_empty_time > self.timeout
+
+    def reject(self, request):
+        self._count_rejected('queue_full')
+        return RejectedRequestDelegate(request)
+
+    def wrap(self, request, delegate):
+        if not self._queue and self.has_free_slot():
+            return delegate
+
+        return QueuedRequestDelegate(self, request, delegate)
+
+    def enqueue(self, entry):
+        if not self._queue and self.has_free_slot():
+            entry.delegate.finish()
+            return
+
+        now = time.time()
+        if len(self._queue) >= self.max_size:
+            self._count_rejected('queue_full')
+            send_service_unavailable(entry.request)
+            return
+
+        if not self._queue:
+            self._last_empty_time = now
+
+        entry.enqueue_time = now
+        entry.deadline = now + (self.target_delay if self.is_standing(now) else self.timeout)
+        self._queue.append(entry)
+        self.queued += 1
+
+        if self._timer is None:
+            self._schedule_timer()
+
+    def process(self):
+        now = time.time()
+
+        while self._queue and self.has_free_slot():
+            entry = self._queue.pop() if self.is_standing(now) else self._queue.popleft()
+
+            if entry.closed:
+                continue
+
+            if entry.deadline <= now:
+                self._drop(entry)
+                continue
+
+            self._dispatch(entry, now)
+
+        if not self._queue:
+            self._last_empty_time = now
+
+    def _dispatch(self, entry, now):
+        self._dispatched += 1
+        self._statsd_client.time('handler.queue_time', int((now - entry.enqueue_time) * 1000))
+
+        with stack_context.NullContext():
+            IOLoop.current().add_callback(self._execute, entry)
+
+    def _execute(self, entry):
+        self._dispatched -= 1
+        if not entry.closed:
+            entry.delegate.finish()
+
+    def _drop(self, entry):
+        self._count_rejected('queue_timeout')
+        send_service_unavailable(entry.request)
+
+    def _schedule_timer(self):
+        with stack_context.NullContext():
+            self._timer = IOLoop.current().call_later(self.target_delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        now = time.time()
+
+        for entry in [e for e in self._queue if e.closed or e.deadline <= now]:
+            self._queue.remove(entry)
+            if not entry.closed:
+                self._drop(entry)
+
+        self.process()
+
+        if self._queue:
+            self._schedule_timer()
+
+    def _count_rejected(self, reason):
+        self.rejected += 1
+        self._rejected_since_log += 1
+        self._statsd_client.count('handler.rejected', 1, reason=reason)
+
+        now = time.time()
+        if now - self._last_rejected_log_time >= REJECTED_LOG_INTERVAL_SEC:
+            handlers_queue_logger.warning(
+                'rejected %s requests: too many active handlers (%s), %s requests in queue',
+                self._rejected_since_log, ActiveHandlersLimit.count, len(self._queue)
+            )
+            self._last_rejected_log_time = now
+            self._rejected_since_log = 0
+
+    def get_stats(self):
+        return {
+            'size': len(self._queue),
+            'queued': self.queued,
+            'rejected': self.rejected,
+        }
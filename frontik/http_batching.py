@@ -0,0 +1,136 @@
+import logging
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+http_batching_logger = logging.getLogger('http_batching')
+
+
+def extract_by_key(result, key):
+    """Default demultiplexer: bulk response is a JSON object with string keys"""
+    data = result.data
+    if not isinstance(data, dict):
+        raise ValueError('bulk response is not a JSON object')
+
+    return data.get(str(key))
+
+
+class BatchItemResult:
+    """
+    Result of one key of a bulk request: `data` is the item extracted from the bulk response,
+    other attributes (`request`, `response`) are taken from the bulk `RequestResult`.
+    The item is failed if the bulk request is failed or the item can not be extracted from its response.
+    """
+
+    __slots__ = ('_result', 'data', 'failed', 'error')
+
+    def __init__(self, result, data=None, error=None):
+        self._result = result
+        self.data = data
+        self.failed = error is not None
+        self.error = error
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def to_dict(self):
+        if self.failed:
+            return {'error': {'reason': self.error, 'code': getattr(self._result.response, 'code', None)}}
+
+        return self.data
+
+
+class _Batch:
+    __slots__ = ('send_batch', 'waiters', 'timeout')
+
+    def __init__(self, send_batch):
+        self.send_batch = send_batch
+        self.waiters = {}
+        self.timeout = None
+
+
+class HttpRequestBatcher:
+    """
+    Collects keys requested from the same upstream url during one IOLoop iteration (or a configured window)
+    by any handlers of the worker and requests them with one bulk request.
+
+    The bulk request is sent with `send_batch` function of the first caller, so it must not depend on the caller.
+    Results are demultiplexed with `extract` function of each caller, every caller gets its own `BatchItemResult`.
+    """
+
+    def __init__(self, statsd_client):
+        self._statsd_client = statsd_client
+        self._batches = {}
+
+    def add(self, batch_key, key, send_batch, extract=extract_by_key, callback=None, window_ms=0, max_batch_size=100):
+        batch = self._batches.get(batch_key)
+
+        if batch is None:
+            batch = self._batches[batch_key] = _Batch(send_batch)
+
+            # scheduled send is bound to the batch, so it does not send the next batch if this one is sent earlier
+            if window_ms:
+                batch.timeout = IOLoop.current().call_later(window_ms / 1000, self._send, batch_key, batch)
+            else:
+                IOLoop.current().add_callback(self._send, batch_key, batch)
+
+        future = Future()
+        batch.waiters.setdefault(key, []).append((future, extract, callback))
+
+        if len(batch.waiters) >= max_batch_size:
+            self._send(batch_key, batch)
+
+        return future
+
+    def _send(self, batch_key, batch):
+        if self._batches.get(batch_key) is not batch:
+            return
+
+        del self._batches[batch_key]
+
+        if batch.timeout is not None:
+            IOLoop.current().remove_timeout(batch.timeout)
+
+        keys = list(batch.waiters)
+        http_batching_logger.debug('sending batch of %s keys', len(keys))
+        self._statsd_client.count('http.client.batched_keys', len(keys))
+
+        try:
+            future = batch.send_batch(keys)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+
+        IOLoop.current().add_future(future, lambda f: self._on_result(batch, f))
+
+    @staticmethod
+    def _on_result(batch, future):
+        for key, waiters in batch.waiters.items():
+            if future.exception() is not None:
+                for key_future, _, _ in waiters:
+                    key_future.set_exception(future.exception())
+                continue
+
+            result = future.result()
+
+            for key_future, extract, callback in waiters:
+                if result.failed:
+                    error = result.response.error
+                    item_result = BatchItemResult(
+                        result, error=str(error) if error is not None else 'failed to parse bulk response'
+                    )
+                else:
+                    try:
+                        item_result = BatchItemResult(result, extract(result, key))
+                    except Exception as e:
+                        http_batching_logger.warning('failed to extract key %s from bulk response: %s', key, e)
+                        item_result = BatchItemResult(result, error=str(e))
+
+                try:
+                    if callable(callback):
+                        callback(item_result.data, result.response)
+                except Exception as e:
+                    http_batching_logger.exception('failed to process batched result for key %s', key)
+                    key_future.set_exception(e)
+                else:
+                    key_future.set_result(item_result)
@@ -0,0 +1,169 @@
+import logging
+import time
+from collections import OrderedDict
+
+from tornado.concurrent import Future
+
+from frontik.http_coalescing import RequestResultView, chain_request_future
+
+http_cache_logger = logging.getLogger('http_cache')
+
+# approximate size of cache entry without response body
+ENTRY_OVERHEAD_SIZE = 1024
+
+
+def parse_cache_control(value):
+    directives = {}
+    for directive in value.split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"')
+
+    return directives
+
+
+def _get_int(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_cache_lifetime(response):
+    """
+    Returns (max_age, stale_while_revalidate) in seconds for a cacheable response or None.
+    Only successful responses with explicit `max-age` (or `s-maxage`) are cached.
+    """
+    if response is None or response.code != 200:
+        return None
+
+    cache_control = response.headers.get('Cache-Control')
+    if not cache_control:
+        return None
+
+    directives = parse_cache_control(cache_control)
+    if 'no-store' in directives or 'no-cache' in directives or 'private' in directives:
+        return None
+
+    max_age = _get_int(directives.get('s-maxage', directives.get('max-age')))
+    max_age -= _get_int(response.headers.get('Age'))
+    if max_age <= 0:
+        return None
+
+    return max_age, _get_int(directives.get('stale-while-revalidate'))
+
+
+class _CacheEntry:
+    __slots__ = ('result', 'size', 'expires', 'stale_until', 'revalidating')
+
+    def __init__(self, result, size, expires, stale_until):
+        self.result = result
+        self.size = size
+        self.expires = expires
+        self.stale_until = stale_until
+        self.revalidating = False
+
+
+class HttpResponseCache:
+    """
+    Per-worker LRU cache of parsed GET responses with TTL taken from `Cache-Control` response header.
+
+    Size of the cache is limited by total size of response bodies (plus fixed overhead per entry).
+    Stale entries are returned within `stale-while-revalidate` interval and revalidated in background.
+    """
+
+    def __init__(self, max_size, statsd_client):
+        self.max_size = max_size
+        self.size = 0
+        self._statsd_client = statsd_client
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def fetch(self, key, host, fetch_method, callback=None):
+        now = time.time()
+        entry = self._entries.get(key)
+
+        if entry is not None and entry.stale_until <= now:
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self._count(host, 'miss')
+            self.misses += 1
+            return chain_request_future(self._fetch_and_store(key, fetch_method), callback, self._wrap_result)
+
+        self._entries.move_to_end(key)
+
+        if entry.expires > now:
+            self._count(host, 'hit')
+            self.hits += 1
+        else:
+            self._count(host, 'stale')
+            self.stale_hits += 1
+
+            if not entry.revalidating:
+                http_cache_logger.debug('revalidating stale response from %s', host)
+                entry.revalidating = True
+                self._fetch_and_store(key, fetch_method)
+
+        future = Future()
+        future.set_result(entry.result)
+        return chain_request_future(future, callback, RequestResultView)
+
+    @staticmethod
+    def _wrap_result(result):
+        if get_cache_lifetime(result.response) is None:
+            return result
+
+        return RequestResultView(result)
+
+    def _fetch_and_store(self, key, fetch_method):
+        future = fetch_method()
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key, future):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.revalidating = False
+
+        if future.exception() is not None:
+            return
+
+        result = RequestResultView.get_shared_result(future.result())
+        lifetime = get_cache_lifetime(result.response)
+        if lifetime is None:
+            return
+
+        size = len(result.response.body or b'') + ENTRY_OVERHEAD_SIZE
+        if size > self.max_size:
+            return
+
+        if entry is not None:
+            self._remove(key)
+
+        max_age, stale_while_revalidate = lifetime
+        now = time.time()
+        self._entries[key] = _CacheEntry(result, size, now + max_age, now + max_age + stale_while_revalidate)
+        self.size += size
+
+        while self.size > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        self.size -= self._entries.pop(key).size
+
+    def _count(self, host, result):
+        self._statsd_client.count('http.client.cache', 1, upstream=host, result=result)
+
+    def get_stats(self):
+        return {
+            'size': self.size,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,126 @@
+import copy
+import logging
+
+from lxml import etree
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+http_coalescing_logger = logging.getLogger('http_coalescing')
+
+
+def chain_request_future(source_future, callback=None, wrap_result=None):
+    """
+    Returns a new future resolved with the result of `source_future` (optionally wrapped with `wrap_result`)
+    after `callback` is called with data and response of the result.
+    """
+    future = Future()
+
+    def _on_result(_):
+        if source_future.exception() is not None:
+            future.set_exception(source_future.exception())
+            return
+
+        result = source_future.result()
+        if wrap_result is not None:
+            result = wrap_result(result)
+
+        try:
+            if callable(callback):
+                callback(result.data, result.response)
+        finally:
+            future.set_result(result)
+
+    IOLoop.current().add_future(source_future, _on_result)
+    return future
+
+
+_NOT_COPIED = object()
+
+
+class RequestResultView:
+    """
+    View of a `RequestResult` shared between handlers. Parsed XML and JSON are copied for every view
+    on first access, because lxml elements are moved when they are appended to another document
+    and handlers may modify parsed data.
+
+    The shared result is never modified: a view of a view refers to the same shared result,
+    so layers sharing results (coalescer and response cache) do not copy data for each other.
+    """
+
+    __slots__ = ('_result', '_data')
+
+    def __init__(self, result):
+        self._result = RequestResultView.get_shared_result(result)
+        self._data = _NOT_COPIED
+
+    @staticmethod
+    def get_shared_result(result):
+        return result._result if isinstance(result, RequestResultView) else result
+
+    @property
+    def data(self):
+        if self._data is _NOT_COPIED:
+            data = self._result.data
+            self._data = copy.deepcopy(data) if isinstance(data, (etree._Element, dict, list)) else data
+
+        return self._data
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def to_etree_element(self):
+        if isinstance(self.data, etree._Element):
+            return self.data
+
+        return self._result.to_etree_element()
+
+
+def make_request_key(host, uri, data, headers, *args):
+    """Returns a hashable key of a GET request, header names are case-insensitive"""
+    data_key = tuple(sorted((k, str(v)) for k, v in data.items())) if data else None
+    headers_key = tuple(sorted((k.lower(), str(v)) for k, v in headers.items())) if headers else None
+    return (host, uri, data_key, headers_key) + args
+
+
+class _InFlightRequest:
+    __slots__ = ('future', 'callers')
+
+    def __init__(self, future):
+        self.future = future
+        self.callers = 1
+
+    def wrap_result(self, result):
+        # result of a request without waiters is not shared and is not copied
+        return result if self.callers == 1 else RequestResultView(result)
+
+
+class HttpRequestCoalescer:
+    """
+    Shares one upstream request between identical requests issued concurrently by handlers of the same worker.
+
+    The first request with a given key is sent to upstream, the following requests with the same key
+    wait for its result until it is received. Every caller gets its own future, which is resolved
+    after the caller's callback is called, and its own copy of parsed response data.
+    `fetch_method` must not depend on the handler which calls it first.
+    """
+
+    def __init__(self, statsd_client):
+        self._statsd_client = statsd_client
+        self._in_flight = {}
+
+    def fetch(self, key, host, fetch_method, callback=None):
+        in_flight = self._in_flight.get(key)
+
+        if in_flight is None:
+            in_flight = _InFlightRequest(fetch_method())
+            self._in_flight[key] = in_flight
+            in_flight.future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            in_flight.callers += 1
+            http_coalescing_logger.debug('coalescing request to %s with in-flight request', host)
+            self._statsd_client.count('http.client.coalesced_requests', 1, upstream=host)
+
+        return chain_request_future(in_flight.future, callback, in_flight.wrap_result)
+
+    def get_in_flight_count(self):
+        return len(self._in_flight)
@@ -1,9 +1,10 @@
+import math
 import socket
 import collections
 from asyncio import Future
 from typing import Optional
 
-from tornado.ioloop import IOLoop
+from tornado.ioloop import IOLoop, PeriodicCallback
 
 from frontik.integrations import Integration, integrations_logger
 from frontik.options import options
@@ -19,12 +20,23 @@ class StatsdIntegration(Integration):
             integrations_logger.info(
                 'statsd integration is disabled: statsd_host / statsd_port options are not configured'
             )
+        elif options.statsd_aggregation_interval_ms:
+            self.statsd_client = AggregatingStatsDClient(
+                options.statsd_host, options.statsd_port, app=app.app,
+                flush_interval_ms=options.statsd_aggregation_interval_ms
+            )
         else:
             self.statsd_client = StatsDClient(options.statsd_host, options.statsd_port, app=app.app)
 
         app.statsd_client = self.statsd_client
         return None
 
+    def deinitialize_app(self, app) -> Optional[Future]:
+        if isinstance(self.statsd_client, AggregatingStatsDClient):
+            self.statsd_client.stop()
+
+        return None
+
     def initialize_handler(self, handler):
         handler.statsd_client = self.statsd_client
 
@@ -40,6 +52,13 @@ def _convert_tags(tags):
     return '.' + '.'.join(_convert_tag(name, value) for name, value in tags.items() if value is not None)
 
 
+def _round_to_significant_digits(value, digits):
+    if value == 0 or not math.isfinite(value):
+        return value
+
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
 def _encode_str(some):
     return some if isinstance(some, (bytes, bytearray)) else some.encode('utf-8')
 
@@ -120,16 +139,15 @@ class StatsDClient:
         self.buffer.clear()
         self.stacking = True
 
-    def flush(self):
-        self.stacking = False
-
-        if not self.buffer:
+    def _write_packed(self, messages):
+        """Writes messages joined into datagrams of at most `max_udp_size` bytes"""
+        if not messages:
             return
 
-        data = self.buffer.popleft()
+        data = messages.popleft()
 
-        while self.buffer:
-            message = self.buffer.popleft()
+        while messages:
+            message = messages.popleft()
 
             if len(data) + len(message) < self.max_udp_size:
                 data += '\n' + message
@@ -140,6 +158,10 @@ class StatsDClient:
 
         self._write(data)
 
+    def flush(self):
+        self.stacking = False
+        self._write_packed(self.buffer)
+
     def count(self, aspect, delta, **kwargs):
         self._send('{}{}:{}|c'.format(aspect, _convert_tags(dict(kwargs, app=self.app)), delta))
 
@@ -148,3 +170,89 @@ class StatsDClient:
 
     def gauge(self, aspect, value, **kwargs):
         self._send('{}{}:{}|g'.format(aspect, _convert_tags(dict(kwargs, app=self.app)), value))
+
+
+class AggregatingStatsDClient(StatsDClient):
+    """
+    Aggregates metrics in memory and sends them every `flush_interval_ms` in packed datagrams:
+    counters are summed, the last value of a gauge is sent, timer values are rounded to `timer_significant_digits`
+    and each distinct value is sent once with `|@<rate>` sample rate, so StatsD server counts all recorded values.
+    Percentiles calculated by StatsD server are based on distinct values only.
+
+    Metric name with tags is formatted once for each aspect and set of tags.
+    """
+
+    max_keys_count = 10000
+
+    def __init__(self, host, port, app=None, max_udp_size=508, reconnect_timeout=2, flush_interval_ms=1000,
+                 timer_significant_digits=3):
+        super().__init__(host, port, app=app, max_udp_size=max_udp_size, reconnect_timeout=reconnect_timeout)
+
+        self.timer_significant_digits = timer_significant_digits
+
+        self._keys = {}
+        self._counters = {}
+        self._gauges = {}
+        self._timers = {}
+
+        self._flush_callback = PeriodicCallback(self.send_aggregated, flush_interval_ms)
+        self._flush_callback.start()
+
+    def _get_key(self, aspect, tags):
+        cache_key = (aspect, tuple(sorted(tags.items()))) if tags else aspect
+
+        try:
+            key = self._keys.get(cache_key)
+        except TypeError:  # unhashable tag value
+            return aspect + _convert_tags(dict(tags, app=self.app))
+
+        if key is None:
+            if len(self._keys) >= self.max_keys_count:
+                self._keys.clear()
+
+            key = self._keys[cache_key] = aspect + _convert_tags(dict(tags, app=self.app))
+
+        return key
+
+    def stack(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def count(self, aspect, delta, **kwargs):
+        key = self._get_key(aspect, kwargs)
+        self._counters[key] = self._counters.get(key, 0) + delta
+
+    def time(self, aspect, value, **kwargs):
+        key = self._get_key(aspect, kwargs)
+        histogram = self._timers.get(key)
+        if histogram is None:
+            histogram = self._timers[key] = {}
+
+        value = _round_to_significant_digits(value, self.timer_significant_digits)
+        histogram[value] = histogram.get(value, 0) + 1
+
+    def gauge(self, aspect, value, **kwargs):
+        self._gauges[self._get_key(aspect, kwargs)] = value
+
+    def send_aggregated(self):
+        counters, self._counters = self._counters, {}
+        gauges, self._gauges = self._gauges, {}
+        timers, self._timers = self._timers, {}
+
+        messages = collections.deque()
+        messages.extend(f'{key}:{delta}|c' for key, delta in counters.items())
+        messages.extend(f'{key}:{value}|g' for key, value in gauges.items())
+
+        for key, histogram in timers.items():
+            messages.extend(
+                f'{key}:{value}|ms' if count == 1 else f'{key}:{value}|ms|@{1 / count:.6g}'
+                for value, count in histogram.items()
+            )
+
+        self._write_packed(messages)
+
+    def stop(self):
+        self._flush_callback.stop()
+        self.send_aggregated()
@@ -1,7 +1,38 @@
 import json
+import logging
 
 from tornado.concurrent import Future
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+json_builder_logger = logging.getLogger('frontik.json_builder')
+
+JSON_SERIALIZERS = ('json', 'orjson', 'auto')
+_use_orjson = False
+
+
+def set_json_serializer(serializer):
+    """
+    Sets serializer for `JsonBuilder.to_string`:
+    * `json` — standard library json module with `FrontikJsonEncoder`
+    * `orjson` — orjson library (falls back to `json` if orjson is not installed)
+    * `auto` — orjson if it is installed, `json` otherwise
+
+    orjson produces compact output and is used only for builders without custom `json_encoder`.
+    """
+    global _use_orjson
+
+    if serializer not in JSON_SERIALIZERS:
+        raise ValueError(f'unknown json serializer: {serializer}')
+
+    if serializer == 'orjson' and orjson is None:
+        json_builder_logger.warning('orjson is not installed, falling back to json serializer')
+
+    _use_orjson = serializer != 'json' and orjson is not None
+
 
 def _encode_value(v):
     def _encode_iterable(l):
@@ -28,6 +59,53 @@ def _encode_value(v):
     return v
 
 
+def _encode_default(v):
+    """Converts one level of non-serializable value, nested values are handled by the serializer itself"""
+    if isinstance(v, (set, frozenset)):
+        return list(v)
+
+    elif isinstance(v, Future):
+        if v.done() and v.exception() is None:
+            return v.result()
+
+        return None
+
+    elif hasattr(v, 'to_dict'):
+        return v.to_dict()
+
+    raise TypeError(f'Object of type {v.__class__.__name__} is not JSON serializable')
+
+
+class _PendingFuture(Exception):
+    pass
+
+
+class _EncodedValue:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _dumps(value, encoder_cls, default=None):
+    if encoder_cls is None:
+        if _use_orjson:
+            return orjson.dumps(
+                value, default=default or _encode_default, option=orjson.OPT_NON_STR_KEYS
+            ).decode('utf-8')
+
+        encoder_cls = FrontikJsonEncoder
+
+    return json.dumps(value, cls=encoder_cls, default=default, ensure_ascii=False)
+
+
+def _resolve_chunk(chunk):
+    while isinstance(chunk, Future) or hasattr(chunk, 'to_dict'):
+        chunk = _encode_default(chunk)
+
+    return chunk
+
+
 class FrontikJsonEncoder(json.JSONEncoder):
     """
     This encoder supports additional value types:
@@ -38,13 +116,22 @@ class FrontikJsonEncoder(json.JSONEncoder):
     * `Future` objects (only if the future is resolved)
     """
     def default(self, obj):
-        return _encode_value(obj)
+        return _encode_default(obj)
 
 
 class JsonBuilder:
-    __slots__ = ('_data', '_encoder', 'root_node')
+    """
+    Collects chunks of data (dicts, futures and objects with `to_dict` method) and merges them into one JSON object.
+
+    In incremental mode, the result of every future (either put as a chunk or as a top-level value of a dict chunk)
+    is encoded as soon as the future is resolved, so `to_string` only has to concatenate encoded values.
+    Plain values are still encoded in `to_string`, because they can be modified after `put`.
+    Results of the futures must not be modified after they are resolved.
+    """
 
-    def __init__(self, root_node=None, json_encoder=None):
+    __slots__ = ('_data', '_encoder', 'root_node', '_incremental', '_encoded_chunks', '_encoded_values')
+
+    def __init__(self, root_node=None, json_encoder=None, incremental=False):
         if root_node is not None and not isinstance(root_node, str):
             raise TypeError(f'Cannot set {root_node} as root node')
 
@@ -52,17 +139,82 @@ class JsonBuilder:
         self._encoder = json_encoder
         self.root_node = root_node
 
+        self._incremental = incremental and (json_encoder is None or issubclass(json_encoder, FrontikJsonEncoder))
+        self._encoded_chunks = {}
+        self._encoded_values = {}
+
     def put(self, *args, **kwargs):
         """Append a chunk of data to JsonBuilder."""
         self._data.extend(args)
         if kwargs:
             self._data.append(kwargs)
 
+        if self._incremental:
+            for chunk in args:
+                self._add_encoding_callbacks(chunk)
+
+            if kwargs:
+                self._add_encoding_callbacks(kwargs)
+
+    def _add_encoding_callbacks(self, chunk):
+        if isinstance(chunk, Future):
+            chunk.add_done_callback(self._encode_chunk)
+
+        elif isinstance(chunk, dict):
+            for value in chunk.values():
+                if isinstance(value, Future):
+                    value.add_done_callback(self._encode_future_value)
+
+    def _pre_encode(self, value):
+        """Returns encoded value or None if the value contains unresolved futures"""
+        if self._encoder is None and _use_orjson:
+            default_encoder = _encode_default
+        else:
+            default_encoder = (self._encoder or FrontikJsonEncoder)().default
+
+        def default(obj):
+            if isinstance(obj, Future) and not obj.done():
+                raise _PendingFuture()
+            return default_encoder(obj)
+
+        try:
+            return _dumps(value, self._encoder, default)
+        except Exception:
+            # unresolved futures or encoding errors, value is encoded again in to_string
+            return None
+
+    def _encode_chunk(self, future):
+        try:
+            chunk = _resolve_chunk(future)
+        except Exception:
+            return
+
+        if chunk is None:
+            self._encoded_chunks[future] = {}
+            return
+
+        if not isinstance(chunk, dict) or not all(isinstance(key, str) for key in chunk):
+            return
+
+        encoded_chunk = {}
+        for key, value in chunk.items():
+            encoded_value = self._pre_encode(value)
+            encoded_chunk[key] = _EncodedValue(encoded_value) if encoded_value is not None else value
+
+        self._encoded_chunks[future] = encoded_chunk
+
+    def _encode_future_value(self, future):
+        encoded_value = self._pre_encode(future)
+        if encoded_value is not None:
+            self._encoded_values[future] = encoded_value
+
     def is_empty(self):
         return len(self._data) == 0
 
     def clear(self):
         self._data = []
+        self._encoded_chunks = {}
+        self._encoded_values = {}
 
     def replace(self, *args, **kwargs):
         self.clear()
@@ -75,8 +227,7 @@ class JsonBuilder:
     def _concat_chunks(self):
         result = {}
         for chunk in self._data:
-            if isinstance(chunk, Future) or hasattr(chunk, 'to_dict'):
-                chunk = _encode_value(chunk)
+            chunk = _resolve_chunk(chunk)
 
             if chunk is not None:
                 result.update(chunk)
@@ -86,8 +237,54 @@ class JsonBuilder:
 
         return result
 
+    def _to_string_incremental(self):
+        result = {}
+        for chunk in self._data:
+            if isinstance(chunk, Future) and chunk in self._encoded_chunks:
+                result.update(self._encoded_chunks[chunk])
+                continue
+
+            chunk = _resolve_chunk(chunk)
+            if chunk is not None:
+                result.update(chunk)
+
+        if not all(isinstance(key, str) for key in result):
+            return None
+
+        if self._encoder is None and _use_orjson:
+            item_separator, key_separator = ',', ':'
+        else:
+            item_separator, key_separator = ', ', ': '
+
+        encoded_items = []
+        for key, value in result.items():
+            if isinstance(value, _EncodedValue):
+                encoded_value = value.value
+            elif isinstance(value, Future) and value in self._encoded_values:
+                encoded_value = self._encoded_values[value]
+            else:
+                encoded_value = _dumps(value, self._encoder)
+
+            encoded_items.append(_dumps(key, self._encoder) + key_separator + encoded_value)
+
+        encoded_result = '{' + item_separator.join(encoded_items) + '}'
+        if self.root_node is not None:
+            encoded_result = '{' + _dumps(self.root_node, self._encoder) + key_separator + encoded_result + '}'
+
+        return encoded_result
+
     def to_string(self):
+        if self._incremental:
+            result = self._to_string_incremental()
+            if result is not None:
+                return result
+
         if self._encoder is None:
+            if _use_orjson:
+                return orjson.dumps(
+                    self._concat_chunks(), default=_encode_default, option=orjson.OPT_NON_STR_KEYS
+                ).decode('utf-8')
+
             return json.dumps(self._concat_chunks(), cls=FrontikJsonEncoder, ensure_ascii=False)
 
         if issubclass(self._encoder, FrontikJsonEncoder):
@@ -1,10 +1,13 @@
+import functools
 import json
 import logging
 import os
 import socket
+import threading
 import time
+from collections import deque
 from logging import Filter, Formatter, Handler
-from logging.handlers import SysLogHandler
+from logging.handlers import SysLogHandler, WatchedFileHandler
 from typing import TYPE_CHECKING
 
 from tornado.log import LogFormatter
@@ -19,6 +22,8 @@ ROOT_LOGGER = logging.root
 JSON_REQUESTS_LOGGER = logging.getLogger('requests')
 
 CUSTOM_JSON_EXTRA = 'custom_json'
+# request context data captured when record is passed to background log writer
+MDC_EXTRA = '_mdc'
 
 
 class Mdc:
@@ -37,9 +42,7 @@ MDC = Mdc()
 
 class ContextFilter(Filter):
     def filter(self, record):
-        handler_name = request_context.get_handler_name()
-        request_id = request_context.get_request_id()
-        record.name = '.'.join(filter(None, [record.name, handler_name, request_id]))
+        record.name += request_context.get_log_name_suffix()
         return True
 
 
@@ -64,6 +67,100 @@ class GlobalLogHandler(Handler):
             request_context.get_log_handler().handle(record)
 
 
+_handlers_generation = 0
+
+
+def invalidate_hot_path_loggers():
+    """
+    Is called when handlers are added or removed or handler levels are changed with standard methods,
+    must be called explicitly after `logger.handlers`, `handler.level` or `logger.propagate` are assigned directly
+    """
+    global _handlers_generation
+    _handlers_generation += 1
+
+
+def _invalidating_hot_path_loggers(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        finally:
+            invalidate_hot_path_loggers()
+
+    wrapper._invalidates_hot_path_loggers = True
+    return wrapper
+
+
+def _patch_logging_methods():
+    for cls, method_name in ((Handler, 'setLevel'), (logging.Logger, 'addHandler'), (logging.Logger, 'removeHandler')):
+        method = getattr(cls, method_name)
+        if not getattr(method, '_invalidates_hot_path_loggers', False):
+            setattr(cls, method_name, _invalidating_hot_path_loggers(method))
+
+
+_patch_logging_methods()
+
+
+def _get_handlers_min_level(logger):
+    levels = []
+    has_handlers = False
+    current = logger
+
+    while current is not None:
+        has_handlers = has_handlers or bool(current.handlers)
+        levels.extend(handler.level for handler in current.handlers if not isinstance(handler, GlobalLogHandler))
+
+        if not current.propagate:
+            break
+
+        current = current.parent
+
+    if not has_handlers:
+        # records are passed to logging.lastResort when there are no handlers at all
+        return logging.lastResort.level if logging.lastResort is not None else logging.NOTSET
+
+    return min(levels) if levels else logging.CRITICAL + 1
+
+
+class HotPathLogger(logging.Logger):
+    """
+    Logger for per-request messages of frontik, which does not create records rejected by all handlers.
+
+    Frontik loggers have NOTSET level, so that records of any level can be collected by the debug page,
+    which makes `Logger.isEnabledFor` always true. `HotPathLogger` also compares the level of a record
+    with min level of the handlers and passes records below it only when the debug log handler
+    is set for the current request.
+    """
+
+    def __init__(self, name, level=logging.NOTSET):
+        super().__init__(name, level)
+        self._reset_handlers_level()
+
+    def _reset_handlers_level(self):
+        self._handlers_level = logging.NOTSET
+        self._handlers_generation = None
+
+    def isEnabledFor(self, level):
+        # handlers level is recalculated after handlers or their levels are changed
+        if self._handlers_generation != _handlers_generation:
+            self._handlers_level = _get_handlers_min_level(self)
+            self._handlers_generation = _handlers_generation
+
+        if level < self._handlers_level and request_context.get_log_handler() is None:
+            return False
+
+        return super().isEnabledFor(level)
+
+
+def get_hot_path_logger(name):
+    logger = logging.getLogger(name)
+    if not isinstance(logger, HotPathLogger):
+        logger.__class__ = HotPathLogger
+        logger._reset_handlers_level()
+
+    return logger
+
+
 class JSONFormatter(Formatter):
     DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%%03d%z'
 
@@ -71,7 +168,7 @@ class JSONFormatter(Formatter):
         message = record.getMessage() if record.msg is not None else None
         timestamp = time.strftime(JSONFormatter.DATE_FORMAT, time.localtime(record.created)) % record.msecs
         stack_trace = self.format_stack_trace(record)
-        mdc = JSONFormatter.get_mdc()
+        mdc = getattr(record, MDC_EXTRA, None) or JSONFormatter.get_mdc()
 
         json_message = {
             'ts': timestamp
@@ -128,13 +225,182 @@ class JSONFormatter(Formatter):
 
 
 _JSON_FORMATTER = JSONFormatter()
+_DEFAULT_FORMATTER = logging.Formatter()
+
+
+def write_records(handler, records):
+    """Formats records and writes them to stream handlers with one write (and one stat for watched files)"""
+    if not isinstance(handler, logging.StreamHandler):
+        # filters are already applied by AsyncLogHandler
+        handler.acquire()
+        try:
+            for record in records:
+                handler.emit(record)
+        finally:
+            handler.release()
+        return
+
+    messages = []
+    for record in records:
+        try:
+            messages.append(handler.format(record) + handler.terminator)
+        except Exception:
+            handler.handleError(record)
+
+    handler.acquire()
+    try:
+        if isinstance(handler, WatchedFileHandler):
+            handler.reopenIfNeeded()
+
+        handler.stream.write(''.join(messages))
+        handler.flush()
+    except Exception:
+        handler.handleError(records[-1])
+    finally:
+        handler.release()
+
+
+class LogWriter:
+    """
+    Bounded buffer of log records, which is drained by a background thread.
+    Records are put to the buffer on the IOLoop thread and are formatted and written in batches by the writer thread.
+    When the buffer is full, new records are dropped and counted.
+    """
+
+    def __init__(self, buffer_size, flush_interval_sec, batch_size=1000):
+        self.buffer_size = buffer_size
+        self.flush_interval_sec = flush_interval_sec
+        self.batch_size = batch_size
+        self.dropped = 0
+
+        self._records = deque()
+        self._reported_dropped = 0
+        self._event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def put(self, handler, record):
+        if len(self._records) >= self.buffer_size:
+            self.dropped += 1
+            return
+
+        if record.exc_info:
+            # traceback is formatted on the calling thread, so the buffer does not keep frames alive
+            if not record.exc_text:
+                record.exc_text = (handler.formatter or _DEFAULT_FORMATTER).formatException(record.exc_info)
+            record.exc_info = None
+
+        self._records.append((handler, record))
+
+        if self._thread is None:
+            self._start()
+        elif len(self._records) == self.batch_size:
+            self._event.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log_writer', daemon=True)
+                self._thread.start()
+
+    def _after_fork(self):
+        # the writer thread is not copied to a forked process, records buffered by the parent are written by it
+        self._records = deque()
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._thread = None
+        self._event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            self._event.wait(self.flush_interval_sec)
+            self._event.clear()
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            while self._records:
+                batches = {}
+                for _ in range(min(len(self._records), self.batch_size)):
+                    handler, record = self._records.popleft()
+                    batches.setdefault(handler, []).append(record)
+
+                for handler, records in batches.items():
+                    write_records(handler, records)
+
+        dropped = self.dropped
+        if dropped > self._reported_dropped:
+            logging.getLogger('frontik.logging').warning(
+                'dropped %s log records: log buffer is full', dropped - self._reported_dropped
+            )
+            self._reported_dropped = dropped
+
+    def get_stats(self):
+        return {
+            'size': len(self._records),
+            'dropped': self.dropped,
+        }
+
+
+class AsyncLogHandler(Handler):
+    """
+    Passes records to `handler` through `LogWriter`. Filters of `handler` are applied and request context data
+    is captured on the calling thread, formatting and writing are done by the writer thread.
+    """
+
+    def __init__(self, handler, writer):
+        super().__init__(handler.level)
+        self.handler = handler
+        self._writer = writer
+
+    def setLevel(self, level):
+        super().setLevel(level)
+        self.handler.setLevel(level)
+
+    def handle(self, record):
+        if not self.handler.filter(record):
+            return False
+
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+
+        setattr(record, MDC_EXTRA, JSONFormatter.get_mdc())
+        self._writer.put(self.handler, record)
+        return True
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.flush()
+        super().close()
+
+
+_LOG_WRITER = None
+
+
+def get_log_writer():
+    global _LOG_WRITER
+
+    if _LOG_WRITER is None:
+        _LOG_WRITER = LogWriter(options.log_buffer_size, options.log_flush_interval_ms / 1000)
+
+    return _LOG_WRITER
+
+
+def get_log_writer_stats():
+    return _LOG_WRITER.get_stats() if _LOG_WRITER is not None else None
 
 
 class StderrFormatter(LogFormatter):
     def format(self, record):
-        handler_name = request_context.get_handler_name()
-        request_id = request_context.get_request_id()
-        record.name = '.'.join(filter(None, [record.name, handler_name, request_id]))
+        record.name += request_context.get_log_name_suffix()
 
         if not record.msg:
             record.msg = ', '.join(f'{k}={v}' for k, v in getattr(record, CUSTOM_JSON_EXTRA, {}).items())
@@ -175,18 +441,22 @@ def bootstrap_logger(logger_info, logger_level, use_json_formatter=True, *, form
     if options.log_dir:
         handlers.extend(_configure_file(logger_name, use_json_formatter, formatter))
 
-    if options.stderr_log:
-        handlers.extend(_configure_stderr(formatter))
-
     if options.syslog:
         handlers.extend(_configure_syslog(logger_name, use_json_formatter, formatter))
 
+    if options.log_async:
+        handlers = [AsyncLogHandler(handler, get_log_writer()) for handler in handlers]
+
+    if options.stderr_log:
+        handlers.extend(_configure_stderr(formatter))
+
     for handler in handlers:
         handler.setLevel(logger_level)
         logger.addHandler(handler)
 
     logger.addHandler(GlobalLogHandler())
     logger.propagate = False
+    invalidate_hot_path_loggers()
 
     return logger
 
@@ -257,4 +527,6 @@ def bootstrap_core_logging():
     for logger_name in options.suppressed_loggers:
         logging.getLogger(logger_name).setLevel(logging.WARN)
 
+    invalidate_hot_path_loggers()
+
     logging.captureWarnings(True)
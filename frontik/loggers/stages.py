@@ -2,9 +2,10 @@ import logging
 import time
 from collections import namedtuple
 
-from frontik import request_context
+from frontik import loop_monitoring, request_context
+from frontik.loggers import get_hot_path_logger
 
-stages_logger = logging.getLogger('stages')
+stages_logger = get_hot_path_logger('stages')
 
 
 class StagesLogger:
@@ -25,20 +26,28 @@ class StagesLogger:
         stage = StagesLogger.Stage(stage_name, delta, start_delta)
 
         self._stages.append(stage)
-        stages_logger.debug('stage "%s" completed in %.2fms', stage.name, stage.delta, extra={'_stage': stage})
+
+        if stages_logger.isEnabledFor(logging.DEBUG):
+            stages_logger.debug('stage "%s" completed in %.2fms', stage.name, stage.delta, extra={'_stage': stage})
 
     def flush_stages(self, status_code):
         """Writes available stages, total value and status code"""
 
+        total = sum(s.delta for s in self._stages)
+        stages = self._stages
+
+        if loop_monitoring.is_enabled():
+            # CPU time spent by request callbacks on event loop thread, overlaps with other stages
+            stages = stages + [StagesLogger.Stage('loop', request_context.get_loop_time() * 1000, 0)]
+
         self._statsd_client.stack()
 
-        for s in self._stages:
+        for s in stages:
             self._statsd_client.time(f'handler.stages.{s.name}.time', int(s.delta))
 
         self._statsd_client.flush()
 
-        stages_str = ' '.join('{s.name}={s.delta:.2f}'.format(s=s) for s in self._stages)
-        total = sum(s.delta for s in self._stages)
+        stages_str = ' '.join('{s.name}={s.delta:.2f}'.format(s=s) for s in stages)
 
         stages_logger.info(
             'timings for %(page)s : %(stages)s',
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+
+from frontik import request_context
+
+LAG_PERCENTILES = (50, 90, 99)
+
+_enabled = False
+_nested_time = 0.0
+
+
+def is_enabled():
+    return _enabled
+
+
+def call_with_loop_time(func, *args, **kwargs):
+    """
+    Calls `func` and attributes CPU time of the event loop thread it takes to the current request.
+    Used for request callbacks which are run in a callback of another (server) context.
+    """
+    global _nested_time
+
+    start_time = time.thread_time()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        delta = time.thread_time() - start_time
+        _nested_time += delta
+        request_context.add_loop_time(delta)
+
+
+def wrap_handle_with_loop_time(handle):
+    """
+    Attributes CPU time each asyncio callback takes to the request from the context of the callback.
+    Thread CPU time is used, so time spent waiting for GIL or while the process is descheduled is not counted.
+    """
+    global _enabled
+
+    old_run = handle._run
+
+    def run(self):
+        nested_time = _nested_time
+        start_time = time.thread_time()
+        old_run(self)
+        delta = time.thread_time() - start_time - (_nested_time - nested_time)
+
+        if self._context is not None:
+            self._context.run(request_context.add_loop_time, delta)
+
+    handle._run = run
+    _enabled = True
+
+
+def get_percentiles(samples, percentiles):
+    if not samples:
+        return {}
+
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return {f'p{p}': samples[min(last, int(len(samples) * p / 100))] for p in percentiles}
+
+
+class LoopLagProbe:
+    """
+    Periodically schedules a callback on the event loop and measures how late it is run.
+    Lag is sent as `ioloop.lag` StatsD timer and last `samples_count` values are kept for percentiles.
+    """
+
+    def __init__(self, interval_ms, statsd_client, samples_count=600):
+        self.interval = interval_ms / 1000
+        self._statsd_client = statsd_client
+        self._samples = deque(maxlen=samples_count)
+        self._expected_time = None
+        self._handle = None
+
+    def start(self):
+        loop = asyncio.get_event_loop()
+        self._expected_time = loop.time() + self.interval
+        self._handle = loop.call_at(self._expected_time, self._probe, loop)
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _probe(self, loop):
+        lag_ms = max(loop.time() - self._expected_time, 0) * 1000
+        self._samples.append(lag_ms)
+        self._statsd_client.time('ioloop.lag', round(lag_ms, 3))
+
+        self.start()
+
+    def get_last_lag(self):
+        return self._samples[-1] if self._samples else 0
+
+    def get_stats(self):
+        stats = {k: round(v, 3) for k, v in get_percentiles(self._samples, LAG_PERCENTILES).items()}
+        stats['max'] = round(max(self._samples), 3) if self._samples else None
+        stats['samples'] = len(self._samples)
+        return stats
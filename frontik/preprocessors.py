@@ -1,4 +1,7 @@
-def preprocessor(function_or_list):
+from functools import partial
+
+
+def preprocessor(function_or_list=None, after=None):
     """Creates a preprocessor decorator for `PageHandler.get_page`, `PageHandler.post_page` etc.
 
     Preprocessor is a function that accepts handler instance as its only parameter.
@@ -29,8 +32,35 @@ def preprocessor(function_or_list):
 
     When the ``Future`` returned by ``get_a`` is resolved, ``get_b`` is called.
     Finally, after ``get_b`` is executed, ``get_page`` will be called.
+
+    Preprocessor can declare preprocessors it depends on with ``after`` argument.
+    Such preprocessor is started as soon as its dependencies are completed, so independent
+    preprocessors are executed concurrently::
+        @preprocessor
+        def get_session(handler):
+            ...
+
+        @preprocessor(after=[get_session])
+        def get_user(handler):
+            ...
+
+        @preprocessor(after=[get_session])
+        def get_settings(handler):
+            ...
+
+    Here ``get_user`` and ``get_settings`` are executed concurrently after ``get_session``.
+    Preprocessors without declared dependencies still wait for all preceding preprocessors.
     """
 
+    if function_or_list is None:
+        return partial(preprocessor, after=after)
+
+    if after is not None:
+        if not callable(function_or_list):
+            raise TypeError('dependencies can only be declared for a single preprocessor')
+
+        function_or_list._preprocessor_after = _unwrap_preprocessors(after)
+
     def preprocessor_decorator(func):
         if callable(function_or_list):
             _register_preprocessors(func, [function_or_list])
@@ -60,3 +90,46 @@ def _unwrap_preprocessors(preprocessors):
 
 def _register_preprocessors(func, preprocessors):
     setattr(func, '_preprocessors', preprocessors + _get_preprocessors(func))
+
+
+def _get_preprocessors_dependencies(preprocessors):
+    """
+    Returns a list with a set of indices of preprocessors each preprocessor depends on
+    or None if no preprocessor declares its dependencies.
+    """
+    if not any(hasattr(p, '_preprocessor_after') for p in preprocessors):
+        return None
+
+    indices = {}
+    for i, p in enumerate(preprocessors):
+        indices.setdefault(p, i)
+
+    dependencies = []
+    for i, p in enumerate(preprocessors):
+        after = getattr(p, '_preprocessor_after', None)
+        if after is None:
+            dependencies.append(set(range(i)))
+            continue
+
+        for dep in after:
+            if dep not in indices:
+                raise ValueError(f'preprocessor {dep.__name__} required by {p.__name__} is not in preprocessors chain')
+
+        dependencies.append({indices[dep] for dep in after})
+
+    _check_cycles(preprocessors, dependencies)
+    return dependencies
+
+
+def _check_cycles(preprocessors, dependencies):
+    completed = set()
+    pending = set(range(len(preprocessors)))
+
+    while pending:
+        ready = {i for i in pending if dependencies[i] <= completed}
+        if not ready:
+            names = ', '.join(sorted({preprocessors[i].__name__ for i in pending}))
+            raise ValueError(f'preprocessors {names} have cyclic dependencies')
+
+        completed |= ready
+        pending -= ready
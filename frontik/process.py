@@ -4,21 +4,76 @@ import logging
 import os
 import signal
 import sys
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
 from tornado.util import errno_from_exception
 
+from frontik.worker_metrics import get_rss_bytes
+
 log = logging.getLogger('fork')
 
+_worker_id = None
+
+
+def get_worker_id():
+    """Returns the number of the current worker process or None in the master (or single) process"""
+    return _worker_id
+
 
 @dataclass
 class State:
     server: bool
     children: dict
     terminating: bool
+    # (replacement pid, recycled pid, fork time) of the worker being recycled
+    replacement: tuple = None
+    # recycled workers which are shutting down
+    recycled: set = field(default_factory=set)
+
+
+class WorkersRecyclePolicy:
+    """
+    Decides when a worker must be replaced with a new one: when its RSS exceeds `max_rss_mb`
+    or it has handled `max_requests` requests (request counts are read from `shared_metrics`).
+
+    A replacement is considered ready when it has written its pid to `ready_pid` field of `shared_metrics`
+    (after its HTTP server is started and registered in service discovery) or after `ready_timeout_sec`.
+    """
+
+    def __init__(self, max_rss_mb=None, max_requests=None, shared_metrics=None,
+                 check_interval_sec=1.0, ready_timeout_sec=30.0):
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.max_requests = max_requests
+        self.shared_metrics = shared_metrics
+        self.check_interval_sec = check_interval_sec
+        self.ready_timeout_sec = ready_timeout_sec
+
+    def get_recycle_reason(self, pid, worker_id):
+        if self.max_rss_bytes is not None:
+            rss_bytes = get_rss_bytes(pid)
+            if rss_bytes is not None and rss_bytes > self.max_rss_bytes:
+                return f'RSS is {rss_bytes} bytes'
+
+        if self.max_requests and self.shared_metrics is not None:
+            slot = self.shared_metrics.get_slot(worker_id)
+            if slot['pid'] == pid and slot['requests'] >= self.max_requests:
+                return f'{int(slot["requests"])} requests handled'
+
+        return None
+
+    def is_ready(self, pid, worker_id, fork_time):
+        if time.time() - fork_time > self.ready_timeout_sec:
+            return True
+
+        if self.shared_metrics is None:
+            return time.time() - fork_time > self.check_interval_sec
 
+        return self.shared_metrics.get_slot(worker_id)['ready_pid'] == pid
 
-def fork_workers(worker_function, *, num_workers, after_workers_up_action, before_workers_shutdown_action):
+
+def fork_workers(worker_function, *, num_workers, after_workers_up_action, before_workers_shutdown_action,
+                 recycle_policy=None):
     log.info("starting %d processes", num_workers)
     state = State(server=True, children={}, terminating=False)
 
@@ -29,6 +84,8 @@ def fork_workers(worker_function, *, num_workers, after_workers_up_action, befor
         state.terminating = True
         before_workers_shutdown_action()
         for pid, id in state.children.items():
+            if pid in state.recycled:
+                continue
             log.info('sending SIGTERM to child %d (pid %d)', id, pid)
             os.kill(pid, signal.SIGTERM)
 
@@ -42,23 +99,38 @@ def fork_workers(worker_function, *, num_workers, after_workers_up_action, befor
 
     gc.enable()
     after_workers_up_action()
-    _supervise_workers(state, worker_function)
+    _supervise_workers(state, worker_function, num_workers, recycle_policy)
 
 
-def _supervise_workers(state, worker_function):
+def _supervise_workers(state, worker_function, num_workers, recycle_policy=None):
 
     while state.children:
         try:
-            pid, status = os.wait()
+            if recycle_policy is None:
+                pid, status = os.wait()
+            else:
+                pid, status = os.waitpid(-1, os.WNOHANG)
         except OSError as e:
             if errno_from_exception(e) == errno.EINTR:
                 continue
             raise
 
+        if pid == 0:
+            is_worker = _recycle_workers(state, num_workers, recycle_policy)
+            if is_worker:
+                worker_function()
+                return
+
+            time.sleep(recycle_policy.check_interval_sec)
+            continue
+
         if pid not in state.children:
             continue
 
         id = state.children.pop(pid)
+        if _is_recycling_exit(state, pid, id):
+            continue
+
         if os.WIFSIGNALED(status):
             log.warning("child %d (pid %d) killed by signal %d, restarting", id, pid, os.WTERMSIG(status))
         elif os.WEXITSTATUS(status) != 0:
@@ -79,12 +151,91 @@ def _supervise_workers(state, worker_function):
     sys.exit(0)
 
 
+def _is_recycling_exit(state, pid, id):
+    """Returns True if the exited child must not be restarted because of recycling"""
+    if pid in state.recycled:
+        state.recycled.discard(pid)
+        log.info("recycled child %d (pid %d) exited", id, pid)
+        return True
+
+    if state.replacement is None:
+        return False
+
+    new_pid, old_pid, _ = state.replacement
+
+    if pid == new_pid:
+        # recycled child is still running, so the replacement is not restarted
+        state.replacement = None
+        log.warning("replacement child %d (pid %d) exited, recycling is cancelled", id, pid)
+        return True
+
+    if pid == old_pid:
+        # replacement is already started for this child
+        state.replacement = None
+        log.warning("child %d (pid %d) exited while being recycled, not restarting", id, pid)
+        return True
+
+    return False
+
+
+def _recycle_workers(state, num_workers, recycle_policy):
+    """
+    Replaces at most one worker at a time: a replacement is forked first, the old worker is sent SIGTERM
+    when the replacement is ready, the next worker is not recycled until the old one exits.
+    Returns True inside the replacement process.
+    """
+    if state.terminating:
+        return False
+
+    if state.replacement is not None:
+        new_pid, old_pid, fork_time = state.replacement
+
+        if recycle_policy.is_ready(new_pid, state.children[new_pid], fork_time):
+            log.info("sending SIGTERM to recycled child %d (pid %d)", state.children[old_pid], old_pid)
+            state.recycled.add(old_pid)
+            state.replacement = None
+            os.kill(old_pid, signal.SIGTERM)
+
+        return False
+
+    if state.recycled:
+        return False
+
+    for pid, id in list(state.children.items()):
+        reason = recycle_policy.get_recycle_reason(pid, id)
+        if reason is None:
+            continue
+
+        # replacement gets a separate id (and metrics slot), there is one spare id for num_workers
+        free_ids = set(range(num_workers + 1)) - set(state.children.values())
+        if not free_ids:
+            log.warning("no free id for replacement of child %d (pid %d), not recycling", id, pid)
+            return False
+
+        new_id = min(free_ids)
+        log.warning("recycling child %d (pid %d): %s, starting replacement %d", id, pid, reason, new_id)
+
+        if _start_child(new_id, state):
+            return True
+
+        new_pid = next(child_pid for child_pid, child_id in state.children.items() if child_id == new_id)
+        state.replacement = (new_pid, pid, time.time())
+        return False
+
+    return False
+
+
 def _start_child(i, state):
     # returns True inside child process, therwise False
+    global _worker_id
+
     pid = os.fork()
     if pid == 0:
+        _worker_id = i
         state.server = False
         state.children = {}
+        state.replacement = None
+        state.recycled = set()
         return True
     else:
         state.children[pid] = i
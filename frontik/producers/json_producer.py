@@ -5,6 +5,7 @@ import weakref
 import jinja2
 from jinja2.utils import concat
 from tornado.escape import to_unicode
+from tornado.iostream import StreamClosedError
 from tornado.options import options
 
 from frontik import json_builder, media_types
@@ -14,6 +15,8 @@ from frontik.producers import ProducerFactory
 
 class JsonProducerFactory(ProducerFactory):
     def __init__(self, application):
+        json_builder.set_json_serializer(options.json_serializer)
+
         if hasattr(application, 'get_jinja_environment'):
             self.environment = application.get_jinja_environment()
         elif options.jinja_template_root is not None:
@@ -31,18 +34,21 @@ class JsonProducerFactory(ProducerFactory):
             environment=self.environment,
             json_encoder=getattr(handler, 'json_encoder', None),
             jinja_context_provider=getattr(handler, 'jinja_context_provider', None),
+            jinja_streaming_flush=getattr(handler, 'jinja_streaming_flush', options.jinja_streaming_flush),
         )
 
 
 class JsonProducer:
-    def __init__(self, handler, environment=None, json_encoder=None, jinja_context_provider=None):
+    def __init__(self, handler, environment=None, json_encoder=None, jinja_context_provider=None,
+                 jinja_streaming_flush=False):
         self.handler = weakref.proxy(handler)
         self.log = weakref.proxy(self.handler.log)
 
-        self.json = json_builder.JsonBuilder(json_encoder=json_encoder)
+        self.json = json_builder.JsonBuilder(json_encoder=json_encoder, incremental=options.json_incremental_encoding)
         self.template_filename = None
         self.environment = environment
         self.jinja_context_provider = jinja_context_provider
+        self.jinja_streaming_flush = jinja_streaming_flush
 
     def __call__(self):
         if get_cookie_or_url_param_value(self.handler, 'notpl') is not None:
@@ -64,7 +70,15 @@ class JsonProducer:
         else:
             return self.json.to_dict()
 
-    async def _render_template_stream_on_ioloop(self, batch_render_timeout_ms):
+    def _can_flush_template_parts(self):
+        # render postprocessors need the whole document
+        return self.jinja_streaming_flush and not self.handler._render_postprocessors
+
+    async def _render_template_stream_on_ioloop(self, batch_render_timeout_ms, flush_parts=False):
+        """
+        Renders template in batches, each batch takes no more than `batch_render_timeout_ms`.
+        If `flush_parts` is True, every batch is flushed to the client and None is returned instead of the result.
+        """
         template_render_start_time = time.time()
         template = self.environment.get_template(self.template_filename)
 
@@ -102,7 +116,20 @@ class JsonProducer:
 
             part_index += 1
 
-            if whole_template_render_finished:
+            if flush_parts:
+                self.handler.write(concat(template_parts))
+                template_parts = []
+
+                if whole_template_render_finished:
+                    return template_render_start_time, None
+
+                try:
+                    await self.handler.flush()
+                except StreamClosedError:
+                    self.log.info('connection closed, stopping template rendering')
+                    return template_render_start_time, None
+
+            elif whole_template_render_finished:
                 return template_render_start_time, concat(template_parts)
 
             await asyncio.sleep(0)
@@ -115,7 +142,9 @@ class JsonProducer:
             self.handler.set_header('Content-Type', media_types.TEXT_HTML)
 
         try:
-            render_result = await self._render_template_stream_on_ioloop(options.jinja_streaming_render_timeout_ms)
+            render_result = await self._render_template_stream_on_ioloop(
+                options.jinja_streaming_render_timeout_ms, self._can_flush_template_parts()
+            )
             if self.handler.is_finished():
                 return None, None
 
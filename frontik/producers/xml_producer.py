@@ -1,5 +1,6 @@
 import contextvars
-import copy
+import logging
+import os
 import time
 import weakref
 import re
@@ -13,8 +14,11 @@ import frontik.doc
 import frontik.util
 from frontik import file_cache, media_types
 from frontik.producers import ProducerFactory
+from frontik.producers.xsl_executor import XslProcessError, XslProcessPoolExecutor, apply_xsl_in_process
 from frontik.util import get_abs_path
-from frontik.xml_util import xml_from_file, xsl_from_file
+from frontik.xml_util import CachedXmlFragment, shared_xml_from_file, xml_from_file, xsl_from_file
+
+xml_producer_logger = logging.getLogger('xml_producer')
 
 
 class XMLProducerFactory(ProducerFactory):
@@ -22,10 +26,10 @@ class XMLProducerFactory(ProducerFactory):
         self.xml_cache = file_cache.make_file_cache(
             'XML', 'xml_root',
             get_abs_path(application.app_root, options.xml_root),
-            xml_from_file,
+            shared_xml_from_file if options.xml_cache_copy_on_write else xml_from_file,
             options.xml_cache_limit,
             options.xml_cache_step,
-            deepcopy=True
+            deepcopy=not options.xml_cache_copy_on_write
         )
 
         self.xsl_cache = file_cache.make_file_cache(
@@ -36,11 +40,60 @@ class XMLProducerFactory(ProducerFactory):
             options.xsl_cache_step
         )
 
-        self.executor = ThreadPoolExecutor(options.xsl_executor_pool_size)
+        if options.xsl_executor_mode == 'thread':
+            self.executor = ThreadPoolExecutor(options.xsl_executor_pool_size)
+        elif options.xsl_executor_mode == 'process':
+            # render processes must be forked from worker process, see init_executor
+            self.executor = None
+        else:
+            raise ValueError(f'unknown xsl_executor_mode: {options.xsl_executor_mode}')
+
+        self.xsl_cache_warmup_stats = None
+
+    def init_executor(self):
+        if options.xsl_executor_mode == 'process' and self.executor is None:
+            self.executor = XslProcessPoolExecutor(options.xsl_executor_pool_size, self.xsl_cache)
+
+    def warm_up_xsl_cache(self):
+        """Compiles all stylesheets from xsl_root, is called in master process before forking workers"""
+        if not isinstance(self.xsl_cache, file_cache.FileCache):
+            xml_producer_logger.warning('xsl_root option is undefined, skipping XSL cache warm-up')
+            return
+
+        start_time = time.time()
+        filenames = []
+        for dirpath, _, files in os.walk(self.xsl_cache.root_dir):
+            filenames.extend(
+                os.path.relpath(os.path.join(dirpath, f), self.xsl_cache.root_dir) for f in files if f.endswith('.xsl')
+            )
+
+        if self.xsl_cache.max_len is not None and len(filenames) > self.xsl_cache.max_len:
+            xml_producer_logger.warning(
+                'xsl_cache_limit (%s) is less than number of XSL files (%s)', self.xsl_cache.max_len, len(filenames)
+            )
+
+        loaded = self.xsl_cache.populate(sorted(filenames), xml_producer_logger, skip_errors=True)
+
+        self.xsl_cache_warmup_stats = {
+            'time_ms': round((time.time() - start_time) * 1000, 2),
+            'templates': loaded,
+            'failed': len(filenames) - loaded if self.xsl_cache.max_len != 0 else 0,
+        }
+
+        xml_producer_logger.info(
+            'XSL cache warm-up: loaded %s templates in %.2fms', loaded, self.xsl_cache_warmup_stats['time_ms']
+        )
 
     def get_producer(self, handler):
         return XmlProducer(handler, xml_cache=self.xml_cache, xsl_cache=self.xsl_cache, executor=self.executor)
 
+    def get_cache_stats(self):
+        return {
+            'xml': self.xml_cache.get_stats(),
+            # in process mode stylesheets are loaded from caches of render processes
+            'xsl': 'n/a' if options.xsl_executor_mode == 'process' else self.xsl_cache.get_stats(),
+        }
+
 
 class XmlProducer:
     METAINFO_PREFIX = 'hhmeta_'
@@ -66,17 +119,19 @@ class XmlProducer:
         if not self.transform_filename:
             return self._finish_with_xml()
 
-        try:
-            self.transform = self.xsl_cache.load(self.transform_filename, self.log)
-        except etree.XMLSyntaxError:
-            self.log.error('failed parsing XSL file %s (XML syntax)', self.transform_filename)
-            raise
-        except etree.XSLTParseError:
-            self.log.error('failed parsing XSL file %s (XSL parse error)', self.transform_filename)
-            raise
-        except Exception:
-            self.log.error('failed loading XSL file %s', self.transform_filename)
-            raise
+        # in process mode stylesheets are compiled and cached by render processes
+        if options.xsl_executor_mode != 'process':
+            try:
+                self.transform = self.xsl_cache.load(self.transform_filename, self.log)
+            except etree.XMLSyntaxError:
+                self.log.error('failed parsing XSL file %s (XML syntax)', self.transform_filename)
+                raise
+            except etree.XSLTParseError:
+                self.log.error('failed parsing XSL file %s (XSL parse error)', self.transform_filename)
+                raise
+            except Exception:
+                self.log.error('failed loading XSL file %s', self.transform_filename)
+                raise
 
         return self._finish_with_xslt()
 
@@ -89,47 +144,69 @@ class XmlProducer:
         if self.handler._headers.get('Content-Type') is None:
             self.handler.set_header('Content-Type', media_types.TEXT_HTML)
 
-        def job():
+        profile_run = self.handler.debug_mode.profile_xslt
+        error_log = None
+
+        def job(doc_element):
             start_time = time.time()
-            result = self.transform(copy.deepcopy(self.doc.to_etree_element()),
-                                    profile_run=self.handler.debug_mode.profile_xslt)
-            meta_info = [entry.message.replace(self.METAINFO_PREFIX, '')
-                         for entry in self.transform.error_log
-                         if entry.message.startswith(self.METAINFO_PREFIX)]
-            return start_time, (str(result), meta_info), result.xslt_profile
-
-        def get_xsl_log():
-            return '\n'.join(
-                f'XSLT {e.level_name} in file "{e.filename}", line {e.line}, column {e.column}\n\t{e.message}'
-                for e in self.transform.error_log
-                if not e.message.startswith(self.METAINFO_PREFIX)
-            )
+            result = self.transform(doc_element, profile_run=profile_run)
+            xslt_profile = result.xslt_profile.getroot() if result.xslt_profile is not None else None
+            return start_time, str(result), self.transform.error_log, xslt_profile
 
         try:
-            ctx = contextvars.copy_context()
-            xslt_result = await IOLoop.current().run_in_executor(self.executor, lambda: ctx.run(job))
+            if options.xsl_executor_mode == 'process':
+                start_time, result, error_log, xslt_profile = await IOLoop.current().run_in_executor(
+                    self.executor, apply_xsl_in_process, self.transform_filename, self.doc.to_string(), profile_run
+                )
+
+                if xslt_profile is not None:
+                    xslt_profile = etree.fromstring(xslt_profile)
+            else:
+                ctx = contextvars.copy_context()
+                doc_element = self.doc.to_etree_element()
+                start_time, result, error_log, xslt_profile = await IOLoop.current().run_in_executor(
+                    self.executor, lambda: ctx.run(job, doc_element)
+                )
+
             if self.handler.is_finished():
                 return None, None
 
-            start_time, render_result, xslt_profile = xslt_result
-
             self.log.info('applied XSL %s in %.2fms', self.transform_filename, (time.time() - start_time) * 1000)
 
             if xslt_profile is not None:
-                self.log.debug('XSLT profiling results', extra={'_xslt_profile': xslt_profile.getroot()})
+                self.log.debug('XSLT profiling results', extra={'_xslt_profile': xslt_profile})
 
-            xsl_log = get_xsl_log()
+            xsl_log = self._get_xsl_log(error_log)
             if xsl_log:
                 self.log.warning(xsl_log)
 
             self.handler.stages_logger.commit_stage('xsl')
-            return render_result
+            return result, self._get_meta_info(error_log)
 
         except Exception as e:
+            if options.xsl_executor_mode == 'process':
+                error_log = e.error_log if isinstance(e, XslProcessError) else []
+            elif error_log is None:
+                error_log = self.transform.error_log
+
             self.log.error('failed XSLT %s', self.transform_filename)
-            self.log.error(get_xsl_log())
+            xsl_log = self._get_xsl_log(error_log)
+            if xsl_log:
+                self.log.error(xsl_log)
             raise e
 
+    def _get_meta_info(self, error_log):
+        return [entry.message.replace(self.METAINFO_PREFIX, '')
+                for entry in error_log
+                if entry.message.startswith(self.METAINFO_PREFIX)]
+
+    def _get_xsl_log(self, error_log):
+        return '\n'.join(
+            f'XSLT {e.level_name} in file "{e.filename}", line {e.line}, column {e.column}\n\t{e.message}'
+            for e in error_log
+            if not e.message.startswith(self.METAINFO_PREFIX)
+        )
+
     async def _finish_with_xml(self, escape_xmlns=False):
         self.log.debug('finishing without XSLT')
         if self.handler._headers.get('Content-Type') is None:
@@ -150,6 +227,9 @@ class XmlProducer:
         return self.doc.to_string(), None
 
     def xml_from_file(self, filename):
+        if options.xml_cache_copy_on_write:
+            return CachedXmlFragment(self.xml_cache.load(filename, self.log))
+
         return self.xml_cache.load(filename, self.log)
 
     def __repr__(self):
@@ -0,0 +1,105 @@
+import logging
+import multiprocessing
+import signal
+import time
+from collections import namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from lxml import etree
+
+xsl_executor_logger = logging.getLogger('xsl_executor')
+
+XslLogEntry = namedtuple('XslLogEntry', ('level_name', 'filename', 'line', 'column', 'message'))
+
+_process_xsl_cache = None
+
+
+class XslProcessError(Exception):
+    """Picklable replacement for lxml errors raised in render processes"""
+
+    def __init__(self, message, error_log):
+        super().__init__(message, error_log)
+        self.error_log = error_log
+
+    def __str__(self):
+        return self.args[0]
+
+
+def _get_log_entries(error_log):
+    return [XslLogEntry(e.level_name, e.filename, e.line, e.column, e.message) for e in error_log]
+
+
+def _init_render_process(xsl_cache):
+    global _process_xsl_cache
+    _process_xsl_cache = xsl_cache
+    # render processes are stopped by parent worker, they must not run its SIGTERM handler
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _ping():
+    pass
+
+
+def apply_xsl_in_process(transform_filename, doc_string, profile_run):
+    """
+    Applies XSL from render process xsl cache to serialized document.
+    Returns start time, result string, XSLT error log entries and serialized profile (if requested).
+    """
+
+    start_time = time.time()
+
+    try:
+        transform = _process_xsl_cache.load(transform_filename, xsl_executor_logger)
+    except Exception as e:
+        error_log = _get_log_entries(e.error_log) if isinstance(e, etree.LxmlError) else []
+        raise XslProcessError(f'failed loading XSL file {transform_filename}: {e.__class__.__name__}: {e}', error_log)
+
+    try:
+        result = transform(etree.fromstring(doc_string), profile_run=profile_run)
+    except Exception as e:
+        raise XslProcessError(f'{e.__class__.__name__}: {e}', _get_log_entries(transform.error_log))
+
+    xslt_profile = etree.tostring(result.xslt_profile) if result.xslt_profile is not None else None
+    return start_time, str(result), _get_log_entries(transform.error_log), xslt_profile
+
+
+class XslProcessPoolExecutor(Executor):
+    """
+    Pool of render processes forked from a worker process.
+
+    Render processes inherit XSL cache of the worker, so stylesheets compiled (or warmed up)
+    before the pool is started are not compiled again. Broken pool (e.g. when a render process
+    is killed) is restarted on next submit.
+    """
+
+    def __init__(self, max_workers, xsl_cache):
+        self._max_workers = max_workers
+        self._xsl_cache = xsl_cache
+        self._executor = self._start()
+
+    def _start(self):
+        executor = ProcessPoolExecutor(
+            self._max_workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_render_process,
+            initargs=(self._xsl_cache,)
+        )
+
+        # processes are forked on the first submit, do it before any request is handled
+        executor.submit(_ping)
+        xsl_executor_logger.info('started %d XSL render processes', self._max_workers)
+        return executor
+
+    def submit(self, fn, *args, **kwargs):
+        try:
+            return self._executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            xsl_executor_logger.error('XSL render process pool is broken, restarting')
+            self._executor.shutdown(wait=False)
+            self._executor = self._start()
+            return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait)
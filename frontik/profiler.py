@@ -0,0 +1,62 @@
+import signal
+from collections import Counter
+
+from frontik import request_context
+
+NO_REQUEST_STACK_ROOT = 'no_request'
+
+
+def format_frame(code):
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of the main thread of the worker.
+
+    Stacks are sampled by `SIGPROF` signal handler, which is triggered by CPU time interval timer,
+    so an idle worker is not sampled at all. Each stack is rooted with the name of the handler from request context.
+
+    The timer counts CPU time of all threads of the process, but only the main thread is sampled.
+    While other threads (XSLT executor, log writer) are busy, samples are attributed to whatever the main thread
+    is doing at that moment, usually waiting for events in the IOLoop, so such stacks are overrepresented.
+    Results are returned as collapsed stacks (`root;frame;frame count`) compatible with flamegraph tools.
+    """
+
+    _running = False
+
+    def __init__(self, interval_sec=0.005, max_depth=128):
+        self.interval_sec = interval_sec
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._previous_signal_handler = None
+
+    def start(self):
+        if SamplingProfiler._running:
+            raise RuntimeError('profiler is already running')
+
+        SamplingProfiler._running = True
+        self._previous_signal_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval_sec, self.interval_sec)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous_signal_handler)
+        SamplingProfiler._running = False
+
+    def _sample(self, signum, frame):
+        codes = []
+        while frame is not None and len(codes) < self.max_depth:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+
+        self.samples[(request_context.get_handler_name(), tuple(codes))] += 1
+
+    def get_collapsed_stacks(self):
+        stacks = Counter()
+        for (handler_name, codes), count in self.samples.items():
+            frames = [handler_name or NO_REQUEST_STACK_ROOT]
+            frames.extend(format_frame(code) for code in reversed(codes))
+            stacks[';'.join(frames)] += count
+
+        return '\n'.join(f'{stack} {count}' for stack, count in stacks.most_common())
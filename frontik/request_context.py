@@ -1,22 +1,56 @@
 import contextvars
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 class _Context:
-    __slots__ = ('request', 'request_id', 'handler_name', 'log_handler')
+    __slots__ = ('request', 'request_id', 'handler_name', 'log_handler', 'loop_time', 'log_name_suffix')
 
     def __init__(self, request, request_id):
         self.request = request
         self.request_id = request_id
         self.handler_name = None
         self.log_handler = None
+        self.loop_time = 0.0
+        self.log_name_suffix = None
 
 
 _context = contextvars.ContextVar('context', default=_Context(None, None))
 
+REQUEST_CONTEXT_MODES = ('stack_context', 'contextvars')
+_use_stack_context = True
+
+
+def set_mode(mode):
+    """
+    Sets request context propagation mode:
+    * `stack_context` — request data is kept both in contextvars and in `RequestContext`
+      (which is propagated by tornado `StackContext`)
+    * `contextvars` — request data is kept only in contextvars
+    """
+    global _use_stack_context
+
+    if mode not in REQUEST_CONTEXT_MODES:
+        raise ValueError(f'unknown request context mode: {mode}')
+
+    _use_stack_context = mode == 'stack_context'
+
+
+def is_stack_context_enabled():
+    return _use_stack_context
+
+
+def create_context(request, request_id):
+    return _Context(request, request_id)
+
+
+def set_context(context):
+    """Makes `context` (created by `create_context`) current, callbacks of one request must share its context"""
+    return _context.set(context)
+
 
 def initialize(request, request_id):
-    return _context.set(_Context(request, request_id))
+    return set_context(create_context(request, request_id))
 
 
 def reset(token):
@@ -24,31 +58,91 @@ def reset(token):
 
 
 def get_request():
-    return RequestContext.get('request') or _context.get().request
+    if _use_stack_context:
+        return RequestContext.get('request') or _context.get().request
+
+    return _context.get().request
 
 
 def get_request_id():
-    return RequestContext.get('request_id') or _context.get().request_id
+    if _use_stack_context:
+        return RequestContext.get('request_id') or _context.get().request_id
+
+    return _context.get().request_id
 
 
 def get_handler_name():
-    return RequestContext.get('handler_name') or _context.get().handler_name
+    if _use_stack_context:
+        return RequestContext.get('handler_name') or _context.get().handler_name
+
+    return _context.get().handler_name
 
 
 def set_handler_name(handler_name):
-    RequestContext.set('handler_name', handler_name)
-    _context.get().handler_name = handler_name
+    if _use_stack_context:
+        RequestContext.set('handler_name', handler_name)
+        RequestContext.set('log_name_suffix', None)
+
+    context = _context.get()
+    context.handler_name = handler_name
+    context.log_name_suffix = None
+
+
+def _make_log_name_suffix(handler_name, request_id):
+    return ''.join(f'.{part}' for part in (handler_name, request_id) if part)
+
+
+def get_log_name_suffix():
+    """Returns `.handler_name.request_id` suffix of logger names for the current request, cached per request"""
+    if _use_stack_context and RequestContext.get('request_id') is not None:
+        suffix = RequestContext.get('log_name_suffix')
+        if suffix is None:
+            suffix = _make_log_name_suffix(RequestContext.get('handler_name'), RequestContext.get('request_id'))
+            RequestContext.set('log_name_suffix', suffix)
+
+        return suffix
+
+    context = _context.get()
+    if context.request is None:
+        return _make_log_name_suffix(context.handler_name, context.request_id)
+
+    if context.log_name_suffix is None:
+        context.log_name_suffix = _make_log_name_suffix(context.handler_name, context.request_id)
+
+    return context.log_name_suffix
 
 
 def get_log_handler():
-    return RequestContext.get('log_handler') or _context.get().log_handler
+    if _use_stack_context:
+        return RequestContext.get('log_handler') or _context.get().log_handler
+
+    return _context.get().log_handler
 
 
 def set_log_handler(log_handler):
-    RequestContext.set('log_handler', log_handler)
+    if _use_stack_context:
+        RequestContext.set('log_handler', log_handler)
+
     _context.get().log_handler = log_handler
 
 
+def add_loop_time(delta):
+    context = _context.get()
+    if context.request is not None:
+        context.loop_time += delta
+
+
+def get_loop_time():
+    return _context.get().loop_time
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Runs submitted functions with contextvars (and request data) of the caller"""
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
 class RequestContext:
     """Keeps track of current request data.
 
@@ -1,24 +1,39 @@
 import importlib
-import logging
 import os
 import re
+import sre_constants
+import sre_parse
 from inspect import isclass
 
+import tornado.autoreload
+from tornado.options import options
 from tornado.routing import ReversibleRouter, Router
 from tornado.web import RequestHandler
 
+from frontik.file_cache import LimitedDict
 from frontik.handler import ErrorHandler
+from frontik.loggers import get_hot_path_logger
 from frontik.util import reverse_regex_named_groups
 
-routing_logger = logging.getLogger('frontik.routing')
+routing_logger = get_hot_path_logger('frontik.routing')
 
 MAX_MODULE_NAME_LENGTH = os.pathconf('/', 'PC_PATH_MAX') - 1
 
+_PAGE_NOT_FOUND = object()
+
 
 class FileMappingRouter(Router):
     def __init__(self, module):
         self.name = module.__name__
 
+        if options.routing_cache_limit:
+            # LRU cache of page module name -> Page class (or _PAGE_NOT_FOUND)
+            self._page_cache = LimitedDict(options.routing_cache_limit)
+            if options.autoreload:
+                tornado.autoreload.add_reload_hook(self._page_cache.clear)
+        else:
+            self._page_cache = None
+
     def find_handler(self, request, **kwargs):
         url_parts = request.path.strip('/').split('/')
         application = kwargs['application']
@@ -35,21 +50,40 @@ class FileMappingRouter(Router):
             routing_logger.info('page module name exceeds PATH_MAX (%s), using 404 page', MAX_MODULE_NAME_LENGTH)
             return _get_application_404_handler_delegate(application, request)
 
+        page_class = self._page_cache.get(page_module_name) if self._page_cache is not None else None
+
+        if page_class is None:
+            try:
+                page_class = self._import_page_class(page_module_name)
+            except Exception:
+                routing_logger.exception('error while importing %s module', page_module_name)
+                return _get_application_500_handler_delegate(application, request)
+
+            # autoreload does not watch for new page modules, so missing pages are not cached
+            if self._page_cache is not None and not (page_class is _PAGE_NOT_FOUND and options.autoreload):
+                self._page_cache[page_module_name] = page_class
+
+        elif page_class is _PAGE_NOT_FOUND:
+            routing_logger.debug('%s module not found (cached)', page_module_name)
+
+        if page_class is _PAGE_NOT_FOUND:
+            return _get_application_404_handler_delegate(application, request)
+
+        return application.get_handler_delegate(request, page_class)
+
+    def _import_page_class(self, page_module_name):
         try:
             page_module = importlib.import_module(page_module_name)
             routing_logger.debug('using %s from %s', page_module_name, page_module.__file__)
         except ImportError:
             routing_logger.warning('%s module not found', (self.name, page_module_name))
-            return _get_application_404_handler_delegate(application, request)
-        except Exception:
-            routing_logger.exception('error while importing %s module', page_module_name)
-            return _get_application_500_handler_delegate(application, request)
+            return _PAGE_NOT_FOUND
 
         if not hasattr(page_module, 'Page'):
             routing_logger.error('%s.Page class not found', page_module_name)
-            return _get_application_404_handler_delegate(application, request)
+            return _PAGE_NOT_FOUND
 
-        return application.get_handler_delegate(request, page_module.Page)
+        return page_module.Page
 
 
 class FrontikRouter(ReversibleRouter):
@@ -70,10 +104,13 @@ class FrontikRouter(ReversibleRouter):
             if handler_name is not None:
                 self.handler_names[handler_name] = pattern
 
+        self.routes_index = RoutesPrefixIndex([pattern for pattern, _ in self.handlers])
+
     def find_handler(self, request, **kwargs):
         routing_logger.info('requested url: %s', request.uri)
 
-        for pattern, handler in self.handlers:
+        for index in self.routes_index.get_candidates(request.uri):
+            pattern, handler = self.handlers[index]
             match = pattern.match(request.uri)
             if match:
                 routing_logger.debug('using %r', handler)
@@ -101,6 +138,59 @@ class FrontikRouter(ReversibleRouter):
         return reverse_regex_named_groups(self.handler_names[name], *args, **kwargs)
 
 
+class RoutesPrefixIndex:
+    """
+    Prefix trie over literal prefixes of route patterns.
+
+    `get_candidates` returns indices of patterns (in their original order) which can possibly match the url,
+    so the url is matched only against routes with a suitable prefix and the first match is the same
+    as with a linear scan over all routes.
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self, patterns):
+        # trie node is a pair of (children by char, indices of patterns with a prefix ending at this node)
+        self._root = ({}, [])
+
+        for index, pattern in enumerate(patterns):
+            node = self._root
+            for char in get_literal_prefix(pattern):
+                node = node[0].setdefault(char, ({}, []))
+            node[1].append(index)
+
+    def get_candidates(self, url):
+        node = self._root
+        candidates = list(node[1])
+
+        for char in url:
+            node = node[0].get(char)
+            if node is None:
+                break
+            candidates.extend(node[1])
+
+        candidates.sort()
+        return candidates
+
+
+def get_literal_prefix(pattern):
+    """Returns a string which starts every string matched by `pattern.match`"""
+    if pattern.flags & re.IGNORECASE:
+        return ''
+
+    prefix = []
+    for op, value in sre_parse.parse(pattern.pattern, pattern.flags):
+        if op == sre_constants.AT and value == sre_constants.AT_BEGINNING and not prefix:
+            continue
+
+        if op != sre_constants.LITERAL:
+            break
+
+        prefix.append(chr(value))
+
+    return ''.join(prefix)
+
+
 def _get_application_404_handler_delegate(application, request):
     handler_class, handler_kwargs = application.application_404_handler(request)
     return application.get_handler_delegate(request, handler_class, handler_kwargs)
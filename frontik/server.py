@@ -7,7 +7,6 @@ import re
 import signal
 import socket
 import sys
-from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Type
 
@@ -18,12 +17,14 @@ from tornado.httputil import HTTPServerRequest
 from tornado.options import parse_command_line, parse_config_file
 from tornado.platform.asyncio import BaseAsyncIOLoop
 
+from frontik import loop_monitoring
 from frontik.app import FrontikApplication
 from frontik.loggers import bootstrap_logger, bootstrap_core_logging, MDC
 from frontik.options import options
-from frontik.process import fork_workers
-from frontik.request_context import get_request
+from frontik.process import WorkersRecyclePolicy, fork_workers
+from frontik.request_context import ContextThreadPoolExecutor, get_request
 from frontik.service_discovery import get_sync_service_discovery
+from frontik.worker_metrics import SharedMetrics, start_master_status_server
 
 log = logging.getLogger('server')
 
@@ -59,15 +60,39 @@ def main(config_file=None):
     try:
         app = application(app_root=os.path.dirname(module.__file__), app_module=app_module_name, **options.as_dict())
 
+        if options.xsl_cache_warmup:
+            # compiled stylesheets are shared with forked workers
+            app.xml.warm_up_xsl_cache()
+
         gc.disable()
         gc.collect()
         gc.freeze()
         if options.workers != 1:
             service_discovery_client = get_sync_service_discovery(options, hostname=socket.gethostname())
+
+            recycle_workers = options.worker_max_rss_mb is not None or options.worker_max_requests is not None
+
+            if options.master_status_port is not None or recycle_workers:
+                # shared memory must be mapped before workers are forked, one more slot is for a replacement worker
+                app.shared_metrics = SharedMetrics(options.workers + 1)
+
+            recycle_policy = None
+            if recycle_workers:
+                recycle_policy = WorkersRecyclePolicy(
+                    options.worker_max_rss_mb, options.worker_max_requests, app.shared_metrics
+                )
+
+            def after_workers_up_action():
+                if options.master_status_port is not None:
+                    start_master_status_server(app.shared_metrics, options.host, options.master_status_port)
+
+                service_discovery_client.register_service()
+
             fork_workers(partial(_run_worker, app),
                          num_workers=options.workers,
-                         after_workers_up_action=service_discovery_client.register_service,
-                         before_workers_shutdown_action=service_discovery_client.deregister_service_and_close)
+                         after_workers_up_action=after_workers_up_action,
+                         before_workers_shutdown_action=service_discovery_client.deregister_service_and_close,
+                         recycle_policy=recycle_policy)
         else:
             # run in single process mode
             _run_worker(app, True)
@@ -80,7 +105,7 @@ def _run_worker(app, need_to_init=False):
     gc.enable()
     MDC.init('worker')
     ioloop = tornado.ioloop.IOLoop.current()
-    executor = ThreadPoolExecutor(options.common_executor_pool_size)
+    executor = ContextThreadPoolExecutor(options.common_executor_pool_size)
     ioloop.asyncio_loop.set_default_executor(executor)
     initialize_application_task = ioloop.asyncio_loop.create_task(_init_app(app, ioloop, need_to_init))
 
@@ -106,6 +131,9 @@ async def run_server(app: FrontikApplication, ioloop: BaseAsyncIOLoop, need_to_r
         reprlib.aRepr.maxother = 256
         wrap_handle_with_time_logging(asyncio.Handle, app, slow_tasks_logger)
 
+    if options.request_loop_time:
+        loop_monitoring.wrap_handle_with_loop_time(asyncio.Handle)
+
     log.info('starting server on %s:%s', options.host, options.port)
     http_server = tornado.httpserver.HTTPServer(app, xheaders=options.xheaders)
     http_server.bind(options.port, options.host, reuse_port=options.reuse_port)
@@ -173,6 +201,8 @@ async def _init_app(app: FrontikApplication, ioloop: BaseAsyncIOLoop, need_to_re
     await run_server(app, ioloop, need_to_register_in_service_discovery)
     if need_to_register_in_service_discovery:
         await app.service_discovery_client.register_service()
+    if app.worker_metrics_updater is not None:
+        app.worker_metrics_updater.set_ready()
     log.info('Successfully inited application')
 
 
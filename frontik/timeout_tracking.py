@@ -79,6 +79,29 @@ class TimeoutChecker:
         self.time_since_outer_request_start_sec_supplier = time_since_outer_request_start_sec_supplier
         self.threshold_ms = threshold_ms
 
+    def get_remaining_time_ms(self):
+        return self.outer_timeout_ms - self.time_since_outer_request_start_sec_supplier() * 1000
+
+    def enforce(self, request):
+        """
+        Clamps request timeout and time left for retries to the remaining outer timeout,
+        so retries which can not be finished in time are not made.
+        """
+        if not self.outer_timeout_ms:
+            return
+
+        # zero timeout means no timeout for curl, so at least 1 ms is left
+        remaining_time_sec = max(self.get_remaining_time_ms(), 1) / 1000
+
+        if request.request_timeout > remaining_time_sec:
+            timeout_tracking_logger.debug(
+                'reducing request timeout from %.3f to %.3f sec', request.request_timeout, remaining_time_sec
+            )
+            request.request_timeout = remaining_time_sec
+
+        if request.request_time_left > remaining_time_sec:
+            request.request_time_left = remaining_time_sec
+
     def check(self, request):
         if self.outer_timeout_ms:
             already_spent_time_ms = self.time_since_outer_request_start_sec_supplier() * 1000
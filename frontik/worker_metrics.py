@@ -0,0 +1,208 @@
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from tornado.ioloop import PeriodicCallback
+
+from frontik import media_types
+from frontik.handler_active_limit import ActiveHandlersLimit
+
+worker_metrics_logger = logging.getLogger('worker_metrics')
+
+FIELDS = (
+    'pid', 'ready_pid', 'started', 'updated', 'requests', 'requests_per_sec', 'active_handlers', 'loop_lag_ms',
+    'rss_bytes',
+)
+_FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+_VALUE_SIZE = 8
+
+# slot is considered stale when its worker has not updated it for this number of update intervals
+STALE_INTERVALS = 5
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def get_rss_bytes(pid='self'):
+    if _PAGE_SIZE is None:
+        return None
+
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class SharedMetrics:
+    """
+    Anonymous shared memory region with a slot of float values for each worker.
+
+    The region must be created in the master process before workers are forked. Each worker writes
+    only to its own slot, the master reads all slots. Values are written without locks and syscalls,
+    so a reader can see a slot which is updated partially.
+    """
+
+    def __init__(self, workers_count, update_interval_sec=1.0):
+        self.workers_count = workers_count
+        self.update_interval_sec = update_interval_sec
+        self._mmap = mmap.mmap(-1, workers_count * len(FIELDS) * _VALUE_SIZE)
+        self._values = memoryview(self._mmap).cast('d')
+
+    def set(self, worker_id, field, value):
+        self._values[worker_id * len(FIELDS) + _FIELD_INDEX[field]] = value
+
+    def get_slot(self, worker_id):
+        offset = worker_id * len(FIELDS)
+        return {field: self._values[offset + i] for i, field in enumerate(FIELDS)}
+
+    def get_status(self):
+        now = time.time()
+        workers = []
+
+        for worker_id in range(self.workers_count):
+            slot = self.get_slot(worker_id)
+            if not slot['pid']:
+                continue
+
+            workers.append({
+                'id': worker_id,
+                'pid': int(slot['pid']),
+                'uptime_sec': round(now - slot['started'], 2),
+                'stale': now - slot['updated'] > self.update_interval_sec * STALE_INTERVALS,
+                'requests': int(slot['requests']),
+                'requests_per_sec': round(slot['requests_per_sec'], 2),
+                'active_handlers': int(slot['active_handlers']),
+                'loop_lag_ms': round(slot['loop_lag_ms'], 3),
+                'rss_bytes': int(slot['rss_bytes']),
+            })
+
+        alive_workers = [w for w in workers if not w['stale']]
+
+        return {
+            'workers': workers,
+            'total': {
+                'workers': len(alive_workers),
+                'requests_per_sec': round(sum(w['requests_per_sec'] for w in alive_workers), 2),
+                'active_handlers': sum(w['active_handlers'] for w in alive_workers),
+                'loop_lag_ms': max((w['loop_lag_ms'] for w in alive_workers), default=0),
+                'rss_bytes': sum(w['rss_bytes'] for w in alive_workers),
+            },
+        }
+
+    def get_metrics(self):
+        """Returns metrics of alive workers in Prometheus text format"""
+        status = self.get_status()
+        lines = []
+
+        for name, metric_type in (('requests', 'counter'), ('requests_per_sec', 'gauge'),
+                                  ('active_handlers', 'gauge'), ('loop_lag_ms', 'gauge'), ('rss_bytes', 'gauge')):
+            metric_name = f'frontik_worker_{name}'
+            lines.append(f'# TYPE {metric_name} {metric_type}')
+            lines.extend(
+                f'{metric_name}{{worker="{w["id"]}",pid="{w["pid"]}"}} {w[name]}'
+                for w in status['workers'] if not w['stale']
+            )
+
+        for name, value in status['total'].items():
+            lines.append(f'# TYPE frontik_{name} gauge')
+            lines.append(f'frontik_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class WorkerMetricsUpdater:
+    """Periodically writes metrics of the current worker to its slot of `SharedMetrics`"""
+
+    def __init__(self, shared_metrics, worker_id, app):
+        self._shared_metrics = shared_metrics
+        self._worker_id = worker_id
+        self._app = app
+        self._last_update_time = time.time()
+        self._last_requests_count = app.requests_count
+        self._callback = PeriodicCallback(self.update, shared_metrics.update_interval_sec * 1000)
+
+    def start(self):
+        self._set('pid', os.getpid())
+        self._set('started', time.time())
+        self.update()
+        self._callback.start()
+
+    def set_ready(self):
+        """Is called when the worker accepts connections (and is registered in service discovery)"""
+        self._set('ready_pid', os.getpid())
+
+    def stop(self):
+        self._callback.stop()
+
+    def _set(self, field, value):
+        self._shared_metrics.set(self._worker_id, field, value)
+
+    def update(self):
+        now = time.time()
+        requests_count = self._app.requests_count
+        elapsed = now - self._last_update_time
+
+        if elapsed > 0:
+            self._set('requests_per_sec', (requests_count - self._last_requests_count) / elapsed)
+
+        self._last_update_time = now
+        self._last_requests_count = requests_count
+
+        self._set('requests', requests_count)
+        self._set('active_handlers', ActiveHandlersLimit.count)
+
+        if self._app.loop_lag_probe is not None:
+            self._set('loop_lag_ms', self._app.loop_lag_probe.get_last_lag())
+
+        rss_bytes = get_rss_bytes()
+        if rss_bytes is not None:
+            self._set('rss_bytes', rss_bytes)
+
+        self._set('updated', now)
+
+
+class _MasterStatusHandler(BaseHTTPRequestHandler):
+    shared_metrics = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+
+        if path == '/status':
+            self._respond(200, media_types.APPLICATION_JSON, json.dumps(self.shared_metrics.get_status()))
+        elif path == '/metrics':
+            self._respond(200, media_types.TEXT_PLAIN, self.shared_metrics.get_metrics())
+        else:
+            self._respond(404, media_types.TEXT_PLAIN, 'not found')
+
+    def _respond(self, code, content_type, body):
+        body = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_master_status_server(shared_metrics, host, port):
+    """Serves aggregated `/status` and `/metrics` of workers from a daemon thread of the master process"""
+    handler_class = type('MasterStatusHandler', (_MasterStatusHandler,), {'shared_metrics': shared_metrics})
+    server = HTTPServer((host, port), handler_class)
+
+    # workers restarted by the master must not keep the listening socket
+    os.register_at_fork(after_in_child=server.socket.close)
+
+    thread = threading.Thread(target=server.serve_forever, name='master_status_server', daemon=True)
+    thread.start()
+
+    worker_metrics_logger.info('serving workers status on %s:%s', host, port)
+    return server
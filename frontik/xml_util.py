@@ -1,3 +1,4 @@
+import copy
 import time
 
 from lxml import etree
@@ -18,6 +19,100 @@ def xml_from_file(filename, log):
         raise
 
 
+class SharedXml:
+    """Parsed XML file shared between requests through XML cache, it is serialized once on first use"""
+
+    __slots__ = ('element', '_bytes')
+
+    def __init__(self, element):
+        self.element = element
+        self._bytes = None
+
+    def to_bytes(self):
+        if self._bytes is None:
+            self._bytes = etree.tostring(self.element, encoding='utf-8')
+
+        return self._bytes
+
+
+def shared_xml_from_file(filename, log):
+    return SharedXml(xml_from_file(filename, log))
+
+
+class CachedXmlFragment:
+    """
+    Copy-on-write wrapper for an XML element shared between requests through XML cache.
+
+    Read-only attributes are taken from the shared element, any other attribute access
+    (including `element` property) makes a private deep copy of the element first.
+    Elements returned by read-only lookups (`find`, `xpath`, indexing, etc.) belong to the shared tree
+    and must not be modified.
+
+    `Doc.to_string` splices serialized shared element into the document, so unmodified fragment is not copied.
+    """
+
+    __slots__ = ('_shared', '_element')
+
+    READ_ONLY_ATTRIBUTES = frozenset((
+        'tag', 'text', 'tail', 'prefix', 'sourceline',
+        'get', 'keys', 'items', 'values',
+        'find', 'findall', 'findtext', 'iterfind', 'iter', 'iterchildren', 'iterdescendants', 'itertext', 'xpath',
+    ))
+
+    def __init__(self, shared):
+        self._shared = shared
+        self._element = None
+
+    @property
+    def element(self):
+        if self._element is None:
+            self._element = copy.deepcopy(self._shared.element)
+
+        return self._element
+
+    def is_copied(self):
+        return self._element is not None
+
+    def to_bytes(self):
+        if self._element is not None:
+            return etree.tostring(self._element, encoding='utf-8')
+
+        return self._shared.to_bytes()
+
+    def to_etree_element(self):
+        return self.element
+
+    def _get_element(self):
+        return self._element if self._element is not None else self._shared.element
+
+    def __getattr__(self, name):
+        if self._element is None and name in CachedXmlFragment.READ_ONLY_ATTRIBUTES:
+            return getattr(self._shared.element, name)
+
+        return getattr(self.element, name)
+
+    def __setattr__(self, name, value):
+        if name in CachedXmlFragment.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.element, name, value)
+
+    def __len__(self):
+        return len(self._get_element())
+
+    def __iter__(self):
+        return iter(self._get_element())
+
+    def __getitem__(self, index):
+        return self._get_element()[index]
+
+    def __setitem__(self, index, value):
+        self.element[index] = value
+
+    def __delitem__(self, index):
+        del self.element[index]
+
+
 def xsl_from_file(filename, log):
     start_time = time.time()
     result = etree.XSLT(etree.parse(filename, parser))
@@ -59,6 +59,7 @@ setup(
     extras_require={
         'sentry': ['raven'],
         'kafka': ['aiokafka'],
+        'orjson': ['orjson'],
     },
     zip_safe=False
 )
@@ -0,0 +1,20 @@
+from tornado.httputil import HTTPHeaders
+
+
+class FakeResponse:
+    def __init__(self, code=200, cache_control=None, body=b'', age=None, error=None):
+        self.code = code
+        self.body = body
+        self.error = error
+        self.headers = HTTPHeaders()
+        if cache_control is not None:
+            self.headers['Cache-Control'] = cache_control
+        if age is not None:
+            self.headers['Age'] = age
+
+
+class FakeResult:
+    def __init__(self, data=None, response=None):
+        self.data = data
+        self.response = response if response is not None else FakeResponse()
+        self.failed = self.response.error is not None
@@ -142,6 +142,11 @@ frontik_test_app = FrontikTestInstance(
     f' --config=tests/projects/frontik_debug.cfg {common_frontik_start_options} '
     f' --consul_port={frontik_consul_mock_app.port}'
 )
+frontik_contextvars_app = FrontikTestInstance(
+    './frontik-test --app=tests.projects.test_app '
+    f' --config=tests/projects/frontik_debug.cfg {common_frontik_start_options} '
+    f' --consul_port={frontik_consul_mock_app.port} --request_context_mode=contextvars'
+)
 frontik_re_app = FrontikTestInstance(
     './frontik-test --app=tests.projects.re_app '
     f' --config=tests/projects/frontik_debug.cfg {common_frontik_start_options} '
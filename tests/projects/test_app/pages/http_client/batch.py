@@ -0,0 +1,17 @@
+import frontik.handler
+
+
+class Page(frontik.handler.PageHandler):
+    def get_page(self):
+        ids = self.get_argument('id', None)
+        if ids is not None:
+            self.json.put({'requested': ids})
+            self.json.put({i: int(i) * 2 for i in ids.split(',')})
+            return
+
+        for i in (1, 2, 3):
+            self.json.put({f'item{i}': self.batch_get(self.request.host, self.request.path, i)})
+
+        self.json.put({'requested': self.batch_get(
+            self.request.host, self.request.path, 4, extract=lambda result, key: result.data['requested']
+        )})
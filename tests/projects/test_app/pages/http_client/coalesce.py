@@ -0,0 +1,25 @@
+from tornado import gen
+
+import frontik.handler
+
+
+class Page(frontik.handler.PageHandler):
+    upstream_requests = 0
+
+    def get_page(self):
+        if self.get_argument('upstream', 'false') == 'true':
+            Page.upstream_requests += 1
+            self.json.put({'upstream_requests': Page.upstream_requests})
+            yield gen.sleep(0.1)
+            return
+
+        coalesce = self.get_argument('coalesce', 'true') == 'true'
+
+        def _callback(name, data, response):
+            self.json.put({name: data['upstream_requests']})
+
+        for name in ('first', 'second', 'third'):
+            self.get_url(
+                self.request.host, self.request.path, data={'upstream': 'true'}, coalesce=coalesce,
+                callback=lambda data, response, name=name: _callback(name, data, response)
+            )
@@ -12,6 +12,9 @@ class Page(handler.PageHandler):
 
             self.jinja_context_provider = jinja_context_provider
 
+        if self.get_argument('streaming', 'false') == 'true':
+            self.jinja_streaming_flush = True
+
         super().prepare()
 
     def get_page(self):
@@ -25,9 +28,15 @@ class Page(handler.PageHandler):
         if self.get_argument('template_error', 'false') == 'true':
             del data['req1']
 
+        if self.get_argument('render_postprocessor', 'false') == 'true':
+            self.add_render_postprocessor(lambda handler, template, meta_info: template)
+
         self.set_template(self.get_argument('template', 'jinja.html'))
         self.json.put(data)
 
+        if self.get_argument('finish_with_postprocessors', 'false') == 'true':
+            raise handler.FinishWithPostprocessors(wait_finish_group=True)
+
     def post_page(self):
         invalid_json = self.get_argument('invalid', 'false') == 'true'
 
@@ -0,0 +1,63 @@
+from tornado import gen
+
+from frontik.handler import PageHandler
+from frontik.preprocessors import preprocessor
+
+
+@preprocessor
+def get_session(handler):
+    yield gen.sleep(0.01)
+    handler.run.append('get_session')
+
+
+@preprocessor(after=[get_session])
+def get_user(handler):
+    handler.run.append('get_user')
+    yield gen.sleep(0.1)
+    handler.run.append('get_user_done')
+
+
+@preprocessor(after=[get_session])
+def get_settings(handler):
+    handler.run.append('get_settings')
+    yield gen.sleep(0.01)
+    handler.run.append('get_settings_done')
+
+
+@preprocessor
+def after_all(handler):
+    handler.run.append('after_all')
+
+
+@preprocessor(after=[get_session])
+def finish_page(handler):
+    yield gen.sleep(0.01)
+    handler.finish('finished in preprocessor')
+
+
+@preprocessor(after=[get_session])
+def fail_page(handler):
+    handler.run.append('fail_page')
+    raise ValueError('preprocessor failed')
+
+
+class Page(PageHandler):
+    def prepare(self):
+        super().prepare()
+
+        self.run = []
+        self.json.put({
+            'run': self.run
+        })
+
+    @preprocessor([get_session, get_user, get_settings, after_all])
+    def get_page(self):
+        self.run.append('get_page')
+
+    @preprocessor([get_session, get_user, finish_page])
+    def post_page(self):
+        self.run.append('post_page')
+
+    @preprocessor([get_session, get_user, fail_page])
+    def put_page(self):
+        self.run.append('put_page')
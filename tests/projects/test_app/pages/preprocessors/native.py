@@ -0,0 +1,50 @@
+from tornado import gen
+
+from frontik.handler import PageHandler
+from frontik.preprocessors import preprocessor
+
+
+@preprocessor
+def pp_sync(handler):
+    handler.run.append('pp_sync')
+
+
+@preprocessor
+def pp_generator(handler):
+    yield gen.sleep(0.01)
+    handler.run.append('pp_generator')
+
+
+@preprocessor
+async def pp_async(handler):
+    await gen.sleep(0.01)
+    handler.run.append('pp_async')
+
+
+@preprocessor
+async def pp_finish(handler):
+    handler.finish('finished in preprocessor')
+
+
+class Page(PageHandler):
+    native_page_execution = True
+
+    def prepare(self):
+        super().prepare()
+
+        self.run = []
+        self.json.put({
+            'run': self.run
+        })
+
+    @pp_sync
+    @pp_generator
+    @pp_async
+    async def get_page(self):
+        await gen.sleep(0.01)
+        self.run.append('get_page')
+
+    @pp_finish
+    @pp_sync
+    def post_page(self):
+        self.run.append('post_page')
@@ -2,6 +2,7 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 from tornado.gen import coroutine
+from tornado.ioloop import IOLoop
 
 from frontik import request_context
 from frontik.handler import PageHandler
@@ -22,6 +23,12 @@ class Page(PageHandler):
 
         ThreadPoolExecutor(1).submit(_waited_callback('executor'))
 
+        default_executor_future = IOLoop.current().run_in_executor(None, request_context.get_handler_name)
+        self.add_future(
+            default_executor_future,
+            self.finish_group.add(lambda future: self.json.put({'default_executor': future.result()}))
+        )
+
         self.add_future(self.run_coroutine(), self.finish_group.add_notification())
 
         future = self.post_url(self.request.host, self.request.uri)
@@ -0,0 +1,107 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from logging.handlers import WatchedFileHandler
+
+from frontik.loggers import AsyncLogHandler, LogWriter
+
+
+class TestAsyncLogging(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('test_async_logging')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.stream = io.StringIO()
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+
+    def add_handler(self, handler, writer):
+        handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        self.logger.addHandler(AsyncLogHandler(handler, writer))
+
+    def test_background_write(self):
+        writer = LogWriter(100, 0.01)
+        self.add_handler(logging.StreamHandler(self.stream), writer)
+
+        items = [1]
+        self.logger.info('first %s', items)
+        items.append(2)
+        self.logger.warning('second')
+
+        for _ in range(100):
+            if self.stream.getvalue():
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(self.stream.getvalue(), 'INFO first [1]\nWARNING second\n')
+
+    def test_watched_file(self):
+        log_dir = tempfile.mkdtemp()
+        log_file = os.path.join(log_dir, 'test.log')
+
+        try:
+            writer = LogWriter(100, 10)
+            self.add_handler(WatchedFileHandler(log_file), writer)
+
+            self.logger.info('first')
+            writer.flush()
+
+            os.rename(log_file, log_file + '.1')
+            self.logger.info('second')
+            writer.flush()
+
+            with open(log_file) as f:
+                self.assertEqual(f.read(), 'INFO second\n')
+        finally:
+            shutil.rmtree(log_dir, ignore_errors=True)
+
+    def test_overflow(self):
+        writer = LogWriter(2, 10)
+        self.add_handler(logging.StreamHandler(self.stream), writer)
+
+        for i in range(5):
+            self.logger.info('message %s', i)
+
+        self.assertEqual(writer.get_stats(), {'size': 2, 'dropped': 3})
+
+        writer.flush()
+        self.assertEqual(self.stream.getvalue(), 'INFO message 0\nINFO message 1\n')
+
+    def test_exception(self):
+        writer = LogWriter(100, 10)
+        self.add_handler(logging.StreamHandler(self.stream), writer)
+
+        try:
+            raise ValueError('error')
+        except ValueError:
+            self.logger.exception('failed')
+
+        handler, record = writer._records[0]
+        self.assertIsNone(record.exc_info)
+        self.assertIn('ValueError: error', record.exc_text)
+
+        writer.flush()
+        self.assertIn('ERROR failed\nTraceback', self.stream.getvalue())
+
+    def test_fork(self):
+        writer = LogWriter(100, 10)
+        self.add_handler(logging.StreamHandler(self.stream), writer)
+        self.logger.info('message')
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, str(writer.get_stats()['size']).encode())
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_fd, 10), b'0')
+        os.close(read_fd)
+        os.close(write_fd)
+        self.assertEqual(writer.get_stats()['size'], 1)
@@ -92,6 +92,20 @@ class DebugTestCase(unittest.TestCase):
                 f'simple?{param}', http.client.OK, headers={'Authorization': self.DEBUG_BASIC_AUTH}
             )
 
+    def test_profiler(self):
+        self.assertDebugResponseCode('profiler?duration=0.1', http.client.UNAUTHORIZED)
+
+        response = self.assertDebugResponseCode(
+            'profiler?duration=0.1', http.client.OK, headers={'Authorization': self.DEBUG_BASIC_AUTH}
+        )
+        self.assertEqual(response.headers['Content-Type'], 'text/plain')
+
+        for duration in ('abc', 'nan', 'inf', '-1', '0'):
+            self.assertDebugResponseCode(
+                f'profiler?duration={duration}', http.client.BAD_REQUEST,
+                headers={'Authorization': self.DEBUG_BASIC_AUTH}
+            )
+
     def test_debug_by_basic_auth_with_invalid_header(self):
         invalid_headers = (
             'Token user:god',
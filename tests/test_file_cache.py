@@ -43,6 +43,61 @@ class TestFileCache(unittest.TestCase):
         self.assertEqual(len(d), 10)
         self.assertIn(1, d)
 
+    def test_limited_dict_with_step_evicts_probation_first(self):
+        d = LimitedDict(max_len=4, step=2)
+
+        d[1] = 1
+        d[2] = 2
+        self.assertEqual(d[1], 1)
+        self.assertEqual(d[2], 2)  # both items are promoted to protected segment
+
+        for i in range(3, 10):
+            d[i] = i
+
+        self.assertEqual(len(d), 4)
+        self.assertIn(1, d)
+        self.assertIn(2, d)
+        self.assertNotIn(7, d)
+        self.assertIn(9, d)
+
+    def test_limited_dict_with_step_demotes_protected(self):
+        d = LimitedDict(max_len=3, step=2)
+
+        d[1] = 1
+        d[2] = 2
+        self.assertEqual(d[1], 1)
+        self.assertEqual(d[2], 2)  # 1 is demoted back to probation segment
+
+        d[3] = 3
+        d[4] = 4
+
+        self.assertEqual(len(d), 3)
+        self.assertNotIn(1, d)
+        self.assertIn(2, d)
+
+    def test_limited_dict_stats(self):
+        d = LimitedDict(max_len=2)
+
+        d[1] = 1
+        d[2] = 2
+        d[3] = 3
+
+        self.assertEqual(d.get(1), None)
+        self.assertEqual(d.get(2), 2)
+        self.assertRaises(KeyError, lambda: d[4])
+
+        self.assertEqual(d.hits, 1)
+        self.assertEqual(d.misses, 2)
+        self.assertEqual(d.evictions, 1)
+
+    def test_limited_dict_deepcopy(self):
+        d = LimitedDict(deepcopy=True)
+        d[1] = [1]
+
+        d[1].append(2)
+
+        self.assertEqual(d[1], [1])
+
     def test_unlimited_dict(self):
         d = LimitedDict()
 
@@ -64,6 +119,9 @@ class TestFileCache(unittest.TestCase):
         def info(self, message, *args):
             self.message = message % args
 
+        def exception(self, message, *args):
+            self.message = message % args
+
     def test_file_cache(self):
         c = FileCache('test', self.CACHE_DIR, lambda filename, log: filename, max_len=3)
         log = TestFileCache.MockLog()
@@ -85,6 +143,8 @@ class TestFileCache(unittest.TestCase):
         c.load('parse_error.xsl', log)
         self.assertIn('reading file', log.message)
 
+        self.assertEqual(c.get_stats(), {'size': 3, 'hits': 1, 'misses': 5, 'evictions': 2})
+
     def test_populate(self):
         c = FileCache('test', self.CACHE_DIR, lambda filename, log: filename, max_len=3)
         log = TestFileCache.MockLog()
@@ -103,3 +163,20 @@ class TestFileCache(unittest.TestCase):
         c.populate(['simple.xsl', 'parse_error.xsl', 'simple.xsl'], log, freeze=True)
 
         self.assertRaises(Exception, partial(c.load, 'apply_error.xsl', log))
+
+    def test_populate_skip_errors(self):
+        def load_fn(filename, log):
+            if filename.endswith('parse_error.xsl'):
+                raise ValueError()
+            return filename
+
+        c = FileCache('test', self.CACHE_DIR, load_fn, max_len=None)
+        log = TestFileCache.MockLog()
+
+        self.assertRaises(ValueError, partial(c.populate, ['simple.xsl', 'parse_error.xsl'], log))
+
+        loaded = c.populate(['simple.xsl', 'syntax_error.xsl', 'parse_error.xsl'], log, skip_errors=True)
+
+        self.assertEqual(loaded, 2)
+        self.assertEqual(len(c.cache), 2)
+        self.assertIn('failed to load parse_error.xsl file into test cache', log.message)
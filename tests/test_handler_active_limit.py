@@ -0,0 +1,93 @@
+import unittest
+
+from tornado.web import HTTPError
+
+from frontik.handler_active_limit import ActiveHandlersLimit, AdaptiveLimit
+from frontik.options import options
+
+
+class RecordingStatsDClient:
+    def __init__(self):
+        self.counters = []
+        self.gauges = {}
+
+    def count(self, aspect, delta, **kwargs):
+        self.counters.append((aspect, delta, kwargs))
+
+    def gauge(self, aspect, value, **kwargs):
+        self.gauges[aspect] = value
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    def add_window(self, limit, start, latencies, in_flight):
+        for i, latency in enumerate(latencies):
+            limit.on_sample(latency, in_flight, now=start + i * 0.1 / len(latencies))
+
+        limit.on_sample(latencies[-1], in_flight, now=start + 0.1)
+
+    def test_increase(self):
+        limit = AdaptiveLimit(2, 10, 100, min_window_samples=1)
+        limit._limit = 9
+
+        self.add_window(limit, 0, [50] * 10, in_flight=1)
+        self.assertEqual(limit.limit, 9)
+
+        self.add_window(limit, 1, [50] * 10, in_flight=5)
+        self.assertEqual(limit.limit, 10)
+
+        self.add_window(limit, 2, [50] * 10, in_flight=10)
+        self.assertEqual(limit.limit, 10)
+
+    def test_decrease_once_per_window(self):
+        limit = AdaptiveLimit(2, 10, 100)
+
+        self.add_window(limit, 0, [150] * 100, in_flight=1)
+        self.assertEqual(limit.limit, 9)
+
+        for i in range(1, 100):
+            self.add_window(limit, i, [150] * 10, in_flight=1)
+
+        self.assertEqual(limit.limit, 2)
+
+    def test_slow_outliers(self):
+        limit = AdaptiveLimit(2, 10, 100)
+
+        self.add_window(limit, 0, [50] * 95 + [1000] * 5, in_flight=5)
+        self.assertEqual(limit.limit, 10)
+
+    def test_not_enough_samples(self):
+        limit = AdaptiveLimit(2, 10, 100)
+
+        limit.on_sample(150, 1, now=0)
+        limit.on_sample(150, 1, now=1)
+        self.assertEqual(limit.limit, 10)
+
+    def test_metrics(self):
+        statsd_client = RecordingStatsDClient()
+        limit = AdaptiveLimit(2, 10, 100, statsd_client=statsd_client)
+
+        self.add_window(limit, 0, [150] * 10, in_flight=1)
+        self.assertEqual(statsd_client.gauges['handler.active_limit'], 9)
+        self.assertEqual(statsd_client.gauges['handler.active_limit.p90_latency_ms'], 150)
+
+
+class TestActiveHandlersLimit(unittest.TestCase):
+    def tearDown(self):
+        ActiveHandlersLimit.count = 0
+
+    def test_rejected_metrics(self):
+        statsd_client = RecordingStatsDClient()
+
+        ActiveHandlersLimit.count = options.max_active_handlers + 1
+        with self.assertRaises(HTTPError):
+            ActiveHandlersLimit(statsd_client)
+
+        ActiveHandlersLimit.count = options.max_active_handlers
+        with self.assertRaises(HTTPError):
+            ActiveHandlersLimit(statsd_client, low_priority=True)
+
+        self.assertEqual(statsd_client.counters, [
+            ('handler.rejected', 1, {'reason': 'active_limit'}),
+            ('handler.rejected', 1, {'reason': 'low_priority'}),
+        ])
+        self.assertEqual(statsd_client.gauges['handler.active_count'], options.max_active_handlers)
@@ -0,0 +1,131 @@
+import unittest
+
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.options import options
+
+from frontik.handler_active_limit import ActiveHandlersLimit
+from frontik.handlers_queue import HandlersQueue, QueuedRequestDelegate
+from frontik.integrations.statsd import StatsDClientStub
+
+
+class FakeConnection:
+    def __init__(self):
+        self.code = None
+
+    def write_headers(self, start_line, headers):
+        self.code = start_line.code
+
+    def finish(self):
+        pass
+
+
+class FakeRequest:
+    version = 'HTTP/1.1'
+
+    def __init__(self):
+        self.connection = FakeConnection()
+
+
+class FakeDelegate:
+    def __init__(self, executed, name):
+        self.executed = executed
+        self.name = name
+
+    def finish(self):
+        self.executed.append(self.name)
+        ActiveHandlersLimit.count += 1
+
+    def on_connection_close(self):
+        pass
+
+
+class TestHandlersQueue(unittest.TestCase):
+    def setUp(self):
+        self.max_active_handlers = options.max_active_handlers
+        options.max_active_handlers = 1
+        ActiveHandlersLimit.count = 0
+        self.executed = []
+        self.queue = HandlersQueue(2, 5, 100, StatsDClientStub())
+
+    def tearDown(self):
+        options.max_active_handlers = self.max_active_handlers
+        ActiveHandlersLimit.count = 0
+
+    def add_request(self, name):
+        request = FakeRequest()
+        delegate = self.queue.wrap(request, FakeDelegate(self.executed, name))
+        delegate.finish()
+        return request, delegate
+
+    def release(self):
+        ActiveHandlersLimit.count -= 1
+        self.queue.process()
+
+    @gen.coroutine
+    def next_iteration(self):
+        yield gen.moment
+
+    def test_free_slot(self):
+        _, delegate = self.add_request('first')
+
+        self.assertNotIsInstance(delegate, QueuedRequestDelegate)
+        self.assertEqual(self.executed, ['first'])
+        self.assertFalse(self.queue.is_full())
+
+    def test_queue(self):
+        self.add_request('first')
+        self.add_request('second')
+        self.add_request('third')
+
+        self.assertEqual(self.executed, ['first'])
+        self.assertTrue(self.queue.is_full())
+
+        request, _ = self.add_request('fourth')
+        self.assertEqual(request.connection.code, 503)
+
+        self.release()
+        IOLoop.current().run_sync(self.next_iteration)
+        self.assertEqual(self.executed, ['first', 'second'])
+
+        self.release()
+        IOLoop.current().run_sync(self.next_iteration)
+        self.assertEqual(self.executed, ['first', 'second', 'third'])
+        self.assertEqual(self.queue.get_stats(), {'size': 0, 'queued': 2, 'rejected': 1})
+
+    def test_closed_connection(self):
+        self.add_request('first')
+        _, delegate = self.add_request('second')
+        delegate.on_connection_close()
+
+        self.release()
+        IOLoop.current().run_sync(self.next_iteration)
+        self.assertEqual(self.executed, ['first'])
+
+    def test_timeout(self):
+        self.add_request('first')
+        request, _ = self.add_request('second')
+
+        IOLoop.current().run_sync(lambda: gen.sleep(0.15))
+        self.assertEqual(request.connection.code, 503)
+        self.assertEqual(self.queue.get_stats()['size'], 0)
+
+        self.release()
+        IOLoop.current().run_sync(self.next_iteration)
+        self.assertEqual(self.executed, ['first'])
+
+    def test_standing_queue_lifo(self):
+        self.queue.max_size = 10
+        self.add_request('first')
+        self.add_request('second')
+        self.queue._last_empty_time -= 1
+
+        third, _ = self.add_request('third')
+        self.add_request('fourth')
+
+        self.release()
+        IOLoop.current().run_sync(self.next_iteration)
+        self.assertEqual(self.executed, ['first', 'fourth'])
+
+        IOLoop.current().run_sync(lambda: gen.sleep(0.02))
+        self.assertEqual(third.connection.code, 503)
@@ -0,0 +1,84 @@
+import logging
+import unittest
+
+from frontik import request_context
+from frontik.loggers import (
+    BufferedHandler, GlobalLogHandler, HotPathLogger, get_hot_path_logger, invalidate_hot_path_loggers
+)
+from frontik.request_context import RequestContext
+
+
+class TestHotPathLogger(unittest.TestCase):
+    def setUp(self):
+        self.logger = get_hot_path_logger('test_hot_path_logger')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.handler = BufferedHandler(logging.INFO)
+        self.logger.handlers = [self.handler, GlobalLogHandler()]
+        invalidate_hot_path_loggers()
+
+    def tearDown(self):
+        self.logger.handlers = []
+        invalidate_hot_path_loggers()
+
+    def test_handlers_level(self):
+        self.assertIsInstance(self.logger, HotPathLogger)
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+        self.assertTrue(self.logger.isEnabledFor(logging.INFO))
+
+        self.logger.debug('skipped')
+        self.logger.info('written')
+        self.assertEqual([r.getMessage() for r in self.handler.records], ['written'])
+
+    def test_new_handler(self):
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+        self.logger.addHandler(BufferedHandler(logging.DEBUG))
+        self.assertTrue(self.logger.isEnabledFor(logging.DEBUG))
+
+    def test_handler_level_change(self):
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+
+        self.handler.setLevel(logging.DEBUG)
+        self.assertTrue(self.logger.isEnabledFor(logging.DEBUG))
+
+        self.handler.setLevel(logging.WARNING)
+        self.assertFalse(self.logger.isEnabledFor(logging.INFO))
+
+    def test_removed_handler(self):
+        debug_handler = BufferedHandler(logging.DEBUG)
+        self.logger.addHandler(debug_handler)
+        self.assertTrue(self.logger.isEnabledFor(logging.DEBUG))
+
+        self.logger.removeHandler(debug_handler)
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+
+    def test_request_log_handler(self):
+        token = request_context.initialize(object(), 'request_id')
+        debug_handler = BufferedHandler()
+
+        try:
+            with RequestContext({}):
+                request_context.set_log_handler(debug_handler)
+                self.logger.debug('collected')
+        finally:
+            request_context.reset(token)
+
+        self.assertEqual([r.getMessage() for r in debug_handler.records], ['collected'])
+        self.assertEqual(self.handler.records, [])
+
+
+class TestLogNameSuffix(unittest.TestCase):
+    def test_suffix(self):
+        self.assertEqual(request_context.get_log_name_suffix(), '')
+        token = request_context.initialize(object(), 'request_id')
+
+        try:
+            with RequestContext({'request_id': 'request_id'}):
+                self.assertEqual(request_context.get_log_name_suffix(), '.request_id')
+
+                request_context.set_handler_name('pages.page')
+                self.assertEqual(request_context.get_log_name_suffix(), '.pages.page.request_id')
+        finally:
+            request_context.reset(token)
+
+        self.assertEqual(request_context.get_log_name_suffix(), '')
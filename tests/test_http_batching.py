@@ -0,0 +1,111 @@
+import unittest
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from frontik.http_batching import HttpRequestBatcher
+from frontik.integrations.statsd import StatsDClientStub
+
+from .http_fakes import FakeResponse, FakeResult
+
+
+class TestHttpRequestBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batcher = HttpRequestBatcher(StatsDClientStub())
+        self.batches = []
+
+    def send_batch(self, keys):
+        self.batches.append(keys)
+        future = Future()
+        future.set_result(FakeResult({str(k): k * 2 for k in keys if k != 3}))
+        return future
+
+    def test_one_iteration(self):
+        callbacks = []
+
+        @gen.coroutine
+        def run():
+            futures = [
+                self.batcher.add('batch', key, self.send_batch, callback=lambda data, _: callbacks.append(data))
+                for key in (1, 2, 1, 3)
+            ]
+            results = yield futures
+            return [result.data for result in results]
+
+        self.assertEqual(IOLoop.current().run_sync(run), [2, 4, 2, None])
+        self.assertEqual(self.batches, [[1, 2, 3]])
+        self.assertEqual(sorted(callbacks, key=str), [2, 2, 4, None])
+
+    def test_different_batches_and_max_size(self):
+        @gen.coroutine
+        def run():
+            futures = [
+                self.batcher.add('a', 1, self.send_batch, max_batch_size=2),
+                self.batcher.add('a', 2, self.send_batch, max_batch_size=2),
+                self.batcher.add('a', 4, self.send_batch, max_batch_size=2),
+                self.batcher.add('b', 5, self.send_batch),
+            ]
+            results = yield futures
+            return [result.data for result in results]
+
+        self.assertEqual(IOLoop.current().run_sync(run), [2, 4, 8, 10])
+        self.assertEqual(self.batches, [[1, 2], [4], [5]])
+
+    def test_window(self):
+        @gen.coroutine
+        def run():
+            first = self.batcher.add('a', 1, self.send_batch, window_ms=50)
+            yield gen.sleep(0.01)
+            second = self.batcher.add('a', 2, self.send_batch, window_ms=50)
+            results = yield [first, second]
+            return [result.data for result in results]
+
+        self.assertEqual(IOLoop.current().run_sync(run), [2, 4])
+        self.assertEqual(self.batches, [[1, 2]])
+
+    def test_failed_batch(self):
+        def send_batch(keys):
+            raise ValueError('failed')
+
+        future = self.batcher.add('a', 1, send_batch)
+        self.assertRaises(ValueError, IOLoop.current().run_sync, lambda: future)
+
+    def test_custom_extract(self):
+        future = self.batcher.add('a', 1, self.send_batch, extract=lambda result, key: result.data)
+        self.assertEqual(IOLoop.current().run_sync(lambda: future).data, {'1': 2})
+
+    def test_failed_response(self):
+        def send_batch(keys):
+            future = Future()
+            future.set_result(FakeResult(None, FakeResponse(502, error='HTTP 502: Bad Gateway')))
+            return future
+
+        result = IOLoop.current().run_sync(lambda: self.batcher.add('a', 1, send_batch))
+        self.assertTrue(result.failed)
+        self.assertIsNone(result.data)
+        self.assertEqual(result.response.code, 502)
+        self.assertEqual(result.to_dict(), {'error': {'reason': 'HTTP 502: Bad Gateway', 'code': 502}})
+
+    def test_invalid_response(self):
+        def send_batch(keys):
+            future = Future()
+            future.set_result(FakeResult(['not', 'a', 'dict']))
+            return future
+
+        result = IOLoop.current().run_sync(lambda: self.batcher.add('a', 1, send_batch))
+        self.assertTrue(result.failed)
+        self.assertEqual(result.error, 'bulk response is not a JSON object')
+
+    def test_next_batch_after_max_size(self):
+        @gen.coroutine
+        def run():
+            first = self.batcher.add('a', 1, self.send_batch, max_batch_size=1)
+            second = self.batcher.add('a', 2, self.send_batch, window_ms=50)
+            yield gen.moment
+            self.assertEqual(self.batches, [[1]])
+            results = yield [first, second]
+            return [result.data for result in results]
+
+        self.assertEqual(IOLoop.current().run_sync(run), [2, 4])
+        self.assertEqual(self.batches, [[1], [2]])
@@ -0,0 +1,146 @@
+import copy
+import unittest
+from functools import partial
+from unittest.mock import patch
+
+from lxml import etree
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from frontik.http_cache import HttpResponseCache, get_cache_lifetime, parse_cache_control
+from frontik.http_coalescing import HttpRequestCoalescer
+from frontik.integrations.statsd import StatsDClientStub
+
+from .http_fakes import FakeResponse, FakeResult
+
+
+class TestCacheControl(unittest.TestCase):
+    def test_parse_cache_control(self):
+        self.assertEqual(
+            parse_cache_control('public, Max-Age=60, stale-while-revalidate="30"'),
+            {'public': '', 'max-age': '60', 'stale-while-revalidate': '30'}
+        )
+
+    def test_cache_lifetime(self):
+        self.assertEqual(get_cache_lifetime(FakeResponse(cache_control='max-age=60')), (60, 0))
+        self.assertEqual(get_cache_lifetime(FakeResponse(cache_control='max-age=60, s-maxage=10')), (10, 0))
+        self.assertEqual(
+            get_cache_lifetime(FakeResponse(cache_control='max-age=60, stale-while-revalidate=5', age='20')), (40, 5)
+        )
+
+    def test_not_cacheable(self):
+        self.assertIsNone(get_cache_lifetime(FakeResponse()))
+        self.assertIsNone(get_cache_lifetime(FakeResponse(code=500, cache_control='max-age=60')))
+        self.assertIsNone(get_cache_lifetime(FakeResponse(cache_control='max-age=60, private')))
+        self.assertIsNone(get_cache_lifetime(FakeResponse(cache_control='no-store')))
+        self.assertIsNone(get_cache_lifetime(FakeResponse(cache_control='max-age=invalid')))
+        self.assertIsNone(get_cache_lifetime(FakeResponse(cache_control='max-age=10', age='10')))
+
+
+class TestHttpResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.requests = 0
+
+    def fetch_method(self, response, data=None):
+        def fetch():
+            self.requests += 1
+            future = Future()
+            future.set_result(FakeResult(data, response))
+            return future
+
+        return fetch
+
+    def fetch(self, cache, key, fetch_method):
+        callback_results = []
+        future = cache.fetch(key, 'host', fetch_method, lambda data, response: callback_results.append(data))
+        result = IOLoop.current().run_sync(lambda: future)
+        self.assertEqual(callback_results, [result.data])
+        return result
+
+    def test_cache_hit(self):
+        cache = HttpResponseCache(10000, StatsDClientStub())
+        fetch_method = self.fetch_method(FakeResponse(cache_control='max-age=60'), {'a': 'b'})
+
+        self.assertEqual(self.fetch(cache, 'key', fetch_method).data, {'a': 'b'})
+        self.assertEqual(self.fetch(cache, 'key', fetch_method).data, {'a': 'b'})
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+    def test_not_cacheable_response(self):
+        cache = HttpResponseCache(10000, StatsDClientStub())
+        fetch_method = self.fetch_method(FakeResponse(cache_control='no-cache'))
+
+        self.fetch(cache, 'key', fetch_method)
+        self.fetch(cache, 'key', fetch_method)
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(cache.get_stats()['entries'], 0)
+
+    def test_stale_while_revalidate(self):
+        cache = HttpResponseCache(10000, StatsDClientStub())
+        fetch_method = self.fetch_method(FakeResponse(cache_control='max-age=60, stale-while-revalidate=60'))
+
+        self.fetch(cache, 'key', fetch_method)
+        cache._entries['key'].expires = 0
+
+        self.fetch(cache, 'key', fetch_method)
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(cache.get_stats()['stale_hits'], 1)
+        self.assertGreater(cache._entries['key'].expires, 0)
+
+        cache._entries['key'].stale_until = 0
+        self.fetch(cache, 'key', fetch_method)
+        self.assertEqual(self.requests, 3)
+
+    def test_size_limit(self):
+        cache = HttpResponseCache(3000, StatsDClientStub())
+
+        for key in ('a', 'b', 'c'):
+            self.fetch(cache, key, self.fetch_method(FakeResponse(cache_control='max-age=60', body=b'x' * 100)))
+
+        self.assertEqual(list(cache._entries), ['b', 'c'])
+        self.assertLessEqual(cache.size, 3000)
+
+        self.fetch(cache, 'big', self.fetch_method(FakeResponse(cache_control='max-age=60', body=b'x' * 3000)))
+        self.assertNotIn('big', cache._entries)
+
+    def test_xml_is_copied(self):
+        cache = HttpResponseCache(10000, StatsDClientStub())
+        fetch_method = self.fetch_method(FakeResponse(cache_control='max-age=60'), etree.Element('a'))
+
+        first = self.fetch(cache, 'key', fetch_method)
+        second = self.fetch(cache, 'key', fetch_method)
+        self.assertIsNot(first.to_etree_element(), second.to_etree_element())
+        self.assertEqual(etree.tostring(second.to_etree_element()), b'<a/>')
+
+    def test_coalesced_result_is_copied_once(self):
+        cache = HttpResponseCache(10000, StatsDClientStub())
+        coalescer = HttpRequestCoalescer(StatsDClientStub())
+        shared_result = FakeResult({'a': ['b']}, FakeResponse(cache_control='max-age=60'))
+
+        def fetch():
+            self.requests += 1
+            future = Future()
+            IOLoop.current().add_callback(future.set_result, shared_result)
+            return future
+
+        fetch_method = partial(coalescer.fetch, 'key', 'host', fetch)
+
+        @gen.coroutine
+        def fetch_all():
+            results = yield [cache.fetch('key', 'host', fetch_method) for _ in range(2)]
+            return results
+
+        with patch('frontik.http_coalescing.copy') as copy_module:
+            copy_module.deepcopy.side_effect = copy.deepcopy
+            first, second = IOLoop.current().run_sync(fetch_all)
+            self.assertEqual(copy_module.deepcopy.call_count, 0)
+
+            first.data['a'].append('c')
+            self.assertEqual(second.data, {'a': ['b']})
+            self.assertEqual(copy_module.deepcopy.call_count, 2)
+
+        self.assertEqual(self.requests, 1)
+        self.assertIs(cache._entries['key'].result, shared_result)
+        self.assertEqual(shared_result.data, {'a': ['b']})
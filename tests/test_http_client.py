@@ -29,6 +29,22 @@ class TestHttpClient(unittest.TestCase):
         text = frontik_test_app.get_page_text('http_client/fibonacci?n=6')
         self.assertEqual(text, '13')
 
+    def test_coalesced_requests(self):
+        json = frontik_test_app.get_page_json('http_client/coalesce')
+        self.assertEqual(len(set(json.values())), 1)
+
+    def test_coalesced_requests_with_outer_timeout(self):
+        json = frontik_test_app.get_page('http_client/coalesce', headers={'X-Outer-Timeout-Ms': '900'}).json()
+        self.assertEqual(len(set(json.values())), 1)
+
+    def test_not_coalesced_requests(self):
+        json = frontik_test_app.get_page_json('http_client/coalesce?coalesce=false')
+        self.assertEqual(len(set(json.values())), 3)
+
+    def test_batch_get(self):
+        json = frontik_test_app.get_page_json('http_client/batch')
+        self.assertEqual(json, {'item1': 2, 'item2': 4, 'item3': 6, 'requested': '1,2,3,4'})
+
     def test_timeout(self):
         json = frontik_test_app.get_page_json('http_client/long_page_request')
         self.assertEqual(json, {'error_received': True})
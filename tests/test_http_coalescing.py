@@ -0,0 +1,55 @@
+import unittest
+
+from lxml import etree
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from frontik.http_coalescing import HttpRequestCoalescer
+from frontik.integrations.statsd import StatsDClientStub
+
+from .http_fakes import FakeResult
+
+
+class TestHttpRequestCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = HttpRequestCoalescer(StatsDClientStub())
+        self.requests = 0
+
+    def fetch_method(self, data):
+        def fetch():
+            self.requests += 1
+            future = Future()
+            IOLoop.current().add_callback(future.set_result, FakeResult(data))
+            return future
+
+        return fetch
+
+    def fetch_all(self, data, callers):
+        @gen.coroutine
+        def run():
+            results = yield [self.coalescer.fetch('key', 'host', self.fetch_method(data)) for _ in range(callers)]
+            return results
+
+        return IOLoop.current().run_sync(run)
+
+    def test_single_request_is_not_copied(self):
+        data = {'a': 'b'}
+        result, = self.fetch_all(data, 1)
+        self.assertIs(result.data, data)
+
+    def test_json_is_copied(self):
+        first, second = self.fetch_all({'a': ['b']}, 2)
+        self.assertEqual(self.requests, 1)
+
+        first.data['a'].append('c')
+        self.assertEqual(second.data, {'a': ['b']})
+        self.assertEqual(self.coalescer.get_in_flight_count(), 0)
+
+    def test_xml_is_copied(self):
+        first, second = self.fetch_all(etree.fromstring('<a><b/></a>'), 2)
+        self.assertEqual(self.requests, 1)
+
+        etree.Element('doc').append(first.to_etree_element())
+        self.assertIsNot(first.to_etree_element(), second.to_etree_element())
+        self.assertEqual(etree.tostring(second.to_etree_element()), b'<a><b/></a>')
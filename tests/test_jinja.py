@@ -14,6 +14,21 @@ class TestJinja(unittest.TestCase):
         self.assertTrue(response.headers['content-type'].startswith('text/html'))
         self.assertEqual(response.content, b'<html><body><b>custom1</b><i>custom2</i></body></html>')
 
+    def test_jinja_streaming_flush(self):
+        response = frontik_test_app.get_page('json_page?streaming=true')
+        self.assertEqual(response.headers['transfer-encoding'], 'chunked')
+        self.assertEqual(response.content, b'<html><body><b>1</b><i>2</i></body></html>')
+
+    def test_jinja_streaming_flush_with_postprocessors(self):
+        response = frontik_test_app.get_page('json_page?streaming=true&finish_with_postprocessors=true')
+        self.assertEqual(response.headers['transfer-encoding'], 'chunked')
+        self.assertEqual(response.content, b'<html><body><b>1</b><i>2</i></body></html>')
+
+    def test_jinja_streaming_flush_disabled_by_render_postprocessor(self):
+        response = frontik_test_app.get_page('json_page?streaming=true&render_postprocessor=true')
+        self.assertNotIn('transfer-encoding', response.headers)
+        self.assertEqual(response.content, b'<html><body><b>1</b><i>2</i></body></html>')
+
     def test_jinja_custom_environment(self):
         response = frontik_re_app.get_page('jinja_custom_environment')
         self.assertEqual(response.content, b'<html><body>custom_env_function_value</body></html>')
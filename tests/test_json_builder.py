@@ -1,9 +1,11 @@
+import asyncio
 import json
 import unittest
 
 from tornado.concurrent import Future
 from http_client import DataParseError
 
+from frontik import json_builder
 from frontik.json_builder import JsonBuilder
 from .test_doc import TestDoc
 
@@ -205,3 +207,123 @@ class TestJsonBuilder(unittest.TestCase):
         self.assertEqual(
             j.to_dict(), {'some': ['test1', 'test2', 'test3']}
         )
+
+
+class TestIncrementalJsonBuilder(unittest.TestCase):
+    @staticmethod
+    def run_callbacks():
+        asyncio.get_event_loop().run_until_complete(asyncio.sleep(0))
+
+    def test_future_chunks(self):
+        j = JsonBuilder(root_node='root', incremental=True)
+        f1 = Future()
+        f2 = Future()
+        j.put({'a': 'b', 'c': 'd'}, f1, f2)
+
+        f1.set_result({'c': {'x': {1}}})
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"root": {"a": "b", "c": {"x": [1]}}}""")
+
+        f2.set_result({'a': 'f2'})
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"root": {"a": "f2", "c": {"x": [1]}}}""")
+
+        not_incremental = JsonBuilder(root_node='root')
+        not_incremental.put({'a': 'b', 'c': 'd'}, f1, f2)
+        self.assertEqual(j.to_string(), not_incremental.to_string())
+
+    def test_future_values(self):
+        j = JsonBuilder(incremental=True)
+        f1 = Future()
+        f2 = Future()
+        chunk = {'f1': f1, 'f2': f2, 'plain': []}
+        j.put(chunk)
+
+        f1.set_result(['b', 'c'])
+        self.run_callbacks()
+        chunk['plain'].append('modified after put')
+
+        self.assertEqual(j.to_string(), """{"f1": ["b", "c"], "f2": null, "plain": ["modified after put"]}""")
+
+    def test_nested_pending_future(self):
+        j = JsonBuilder(incremental=True)
+        f1 = Future()
+        f2 = Future()
+        j.put(f1)
+
+        f1.set_result({'nested': f2})
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"nested": null}""")
+
+        f2.set_result({'a': 'b'})
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"nested": {"a": "b"}}""")
+
+    def test_failed_future(self):
+        j = JsonBuilder(incremental=True)
+        f = Future()
+        j.put({'a': 'b'}, f)
+
+        f.set_exception(ValueError())
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"a": "b"}""")
+
+    def test_non_string_keys(self):
+        j = JsonBuilder(incremental=True)
+        f = Future()
+        j.put(f)
+
+        f.set_result({1: 'b'})
+        self.run_callbacks()
+
+        self.assertEqual(j.to_string(), """{"1": "b"}""")
+
+
+@unittest.skipIf(json_builder.orjson is None, 'orjson is not installed')
+class TestJsonBuilderOrjson(unittest.TestCase):
+    def setUp(self):
+        json_builder.set_json_serializer('orjson')
+
+    def tearDown(self):
+        json_builder.set_json_serializer('json')
+
+    def test_simple(self):
+        j = JsonBuilder(root_node='root')
+        j.put({'a': 'b', 1: 'русский'})
+
+        self.assertEqual(j.to_string(), '{"root":{"a":"b","1":"русский"}}')
+
+    def test_set_and_nested_future(self):
+        f1 = Future()
+        f2 = Future()
+        f1.set_result({'nested': f2, 'set': {1}})
+        f2.set_result(['b', 'c'])
+
+        j = JsonBuilder()
+        j.put(f1, {'not_ready': Future()})
+
+        self.assertEqual(json.loads(j.to_string()), {'nested': ['b', 'c'], 'set': [1], 'not_ready': None})
+
+    def test_to_dict(self):
+        class Serializable:
+            def to_dict(self):
+                return {'some': {'nested': frozenset([1])}}
+
+        j = JsonBuilder()
+        j.put(Serializable(), {'a': Serializable()})
+
+        self.assertEqual(j.to_string(), '{"some":{"nested":[1]},"a":{"some":{"nested":[1]}}}')
+
+    def test_custom_encoder(self):
+        j = JsonBuilder(json_encoder=json_builder.FrontikJsonEncoder)
+        j.put({'a': 'b'})
+
+        self.assertEqual(j.to_string(), '{"a": "b"}')
+
+    def test_unknown_serializer(self):
+        self.assertRaises(ValueError, json_builder.set_json_serializer, 'unknown')
@@ -0,0 +1,50 @@
+import asyncio
+import time
+import unittest
+
+from tornado.ioloop import IOLoop
+
+from frontik import loop_monitoring, request_context
+from frontik.integrations.statsd import StatsDClientStub
+from frontik.loop_monitoring import LoopLagProbe, get_percentiles
+
+
+class TestLoopMonitoring(unittest.TestCase):
+    def test_percentiles(self):
+        self.assertEqual(get_percentiles([], (50,)), {})
+        self.assertEqual(get_percentiles(list(range(100, 0, -1)), (50, 99)), {'p50': 51, 'p99': 100})
+
+    def test_lag_probe(self):
+        probe = LoopLagProbe(1, StatsDClientStub())
+
+        async def block_loop():
+            probe.start()
+            await asyncio.sleep(0.005)
+            time.sleep(0.02)
+            await asyncio.sleep(0.005)
+            probe.stop()
+
+        IOLoop.current().run_sync(block_loop)
+
+        stats = probe.get_stats()
+        self.assertGreater(stats['samples'], 0)
+        self.assertGreaterEqual(stats['max'], 15)
+
+    def test_call_with_loop_time(self):
+        token = request_context.initialize(object(), 'request_id')
+
+        try:
+            loop_monitoring.call_with_loop_time(time.sleep, 0.05)
+            self.assertLess(request_context.get_loop_time(), 0.025)
+
+            def busy_loop():
+                start_time = time.thread_time()
+                while time.thread_time() - start_time < 0.01:
+                    pass
+
+            loop_monitoring.call_with_loop_time(busy_loop)
+            self.assertGreaterEqual(request_context.get_loop_time(), 0.01)
+        finally:
+            request_context.reset(token)
+
+        self.assertEqual(request_context.get_loop_time(), 0)
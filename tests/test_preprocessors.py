@@ -3,6 +3,8 @@ import unittest
 
 import requests
 
+from frontik.handler import PageHandler
+from frontik.preprocessors import preprocessor
 from .instances import frontik_test_app
 
 
@@ -21,6 +23,51 @@ class TestPreprocessors(unittest.TestCase):
             }
         )
 
+    def test_preprocessors_dependencies(self):
+        response_json = frontik_test_app.get_page_json('preprocessors/dependencies')
+        self.assertEqual(
+            response_json,
+            {
+                'run': [
+                    'get_session', 'get_user', 'get_settings', 'get_settings_done', 'get_user_done', 'after_all',
+                    'get_page'
+                ]
+            }
+        )
+
+    def test_preprocessors_dependencies_finish(self):
+        response = frontik_test_app.get_page('preprocessors/dependencies', method=requests.post)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, 'finished in preprocessor')
+
+    def test_preprocessors_dependencies_error(self):
+        response = frontik_test_app.get_page('preprocessors/dependencies', method=requests.put)
+        self.assertEqual(response.status_code, 500)
+
+    def test_preprocessors_missing_dependency(self):
+        @preprocessor
+        def first(handler):
+            pass
+
+        @preprocessor(after=[first])
+        def second(handler):
+            pass
+
+        with self.assertRaises(ValueError):
+            class Page(PageHandler):
+                @second
+                def get_page(self):
+                    pass
+
+    def test_native_page_execution(self):
+        response_json = frontik_test_app.get_page_json('preprocessors/native')
+        self.assertEqual(response_json, {'run': ['pp_sync', 'pp_generator', 'pp_async', 'get_page']})
+
+    def test_native_page_execution_finish_in_preprocessor(self):
+        response = frontik_test_app.get_page('preprocessors/native', method=requests.post)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, 'finished in preprocessor')
+
     def test_preprocessor_futures(self):
         response_json = frontik_test_app.get_page_json('preprocessors/preprocessor_futures')
         self.assertEqual(
@@ -0,0 +1,136 @@
+import os
+import signal
+import time
+import unittest
+
+from frontik.process import (
+    State, WorkersRecyclePolicy, _is_recycling_exit, _recycle_workers, _start_child, get_worker_id
+)
+from frontik.worker_metrics import SharedMetrics
+
+
+def _run_fake_worker(shared_metrics, worker_id, ready=True):
+    signal.signal(signal.SIGTERM, lambda signum, frame: os._exit(0))
+    shared_metrics.set(worker_id, 'pid', os.getpid())
+    if ready:
+        shared_metrics.set(worker_id, 'ready_pid', os.getpid())
+    time.sleep(10)
+    os._exit(1)
+
+
+class TestWorkersRecyclePolicy(unittest.TestCase):
+    def test_rss(self):
+        self.assertIsNotNone(WorkersRecyclePolicy(max_rss_mb=1).get_recycle_reason(os.getpid(), 0))
+        self.assertIsNone(WorkersRecyclePolicy(max_rss_mb=1024 * 1024).get_recycle_reason(os.getpid(), 0))
+
+    def test_requests(self):
+        shared_metrics = SharedMetrics(2)
+        policy = WorkersRecyclePolicy(max_requests=100, shared_metrics=shared_metrics)
+
+        shared_metrics.set(1, 'pid', 42)
+        shared_metrics.set(1, 'requests', 99)
+        self.assertIsNone(policy.get_recycle_reason(42, 1))
+
+        shared_metrics.set(1, 'requests', 100)
+        self.assertEqual(policy.get_recycle_reason(42, 1), '100 requests handled')
+        self.assertIsNone(policy.get_recycle_reason(43, 1))
+
+
+class TestRecycleWorkers(unittest.TestCase):
+    def setUp(self):
+        self.shared_metrics = SharedMetrics(3)
+        self.policy = WorkersRecyclePolicy(max_requests=10, shared_metrics=self.shared_metrics, ready_timeout_sec=5)
+        self.state = State(server=True, children={}, terminating=False)
+
+        for i in range(2):
+            self.start_child(i)
+
+    def tearDown(self):
+        for pid in self.state.children:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+    def start_child(self, worker_id):
+        if _start_child(worker_id, self.state):
+            _run_fake_worker(self.shared_metrics, worker_id)
+
+    def recycle(self, ready=True):
+        if _recycle_workers(self.state, 2, self.policy):
+            _run_fake_worker(self.shared_metrics, get_worker_id(), ready)
+
+    def wait_for_slots(self, field='ready_pid'):
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if all(self.shared_metrics.get_slot(i)[field] == pid for pid, i in self.state.children.items()):
+                return
+            time.sleep(0.01)
+
+    def test_replacement_before_termination(self):
+        self.wait_for_slots()
+        old_pid = next(pid for pid, i in self.state.children.items() if i == 1)
+        self.shared_metrics.set(1, 'requests', 10)
+
+        self.recycle()
+        self.assertEqual(len(self.state.children), 3)
+        new_pid, recycled_pid, _ = self.state.replacement
+        self.assertEqual(recycled_pid, old_pid)
+        self.assertEqual(self.state.children[new_pid], 2)
+
+        self.wait_for_slots()
+        self.recycle()
+        self.assertIsNone(self.state.replacement)
+        self.assertEqual(self.state.recycled, {old_pid})
+
+        # next worker is not recycled until the old one exits
+        self.shared_metrics.set(0, 'requests', 10)
+        self.recycle()
+        self.assertIsNone(self.state.replacement)
+
+        pid, status = os.waitpid(old_pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        del self.state.children[old_pid]
+        self.state.recycled.discard(old_pid)
+
+        self.recycle()
+        self.assertIsNotNone(self.state.replacement)
+        self.assertEqual(self.state.children[self.state.replacement[0]], 1)
+
+    def test_replacement_not_ready(self):
+        self.wait_for_slots()
+        self.shared_metrics.set(1, 'requests', 10)
+
+        self.recycle(ready=False)
+        self.wait_for_slots('pid')
+
+        # replacement has started but does not accept connections yet
+        self.recycle()
+        self.assertIsNotNone(self.state.replacement)
+        self.assertEqual(self.state.recycled, set())
+
+    def test_replacement_crash(self):
+        self.wait_for_slots()
+        old_pid = next(pid for pid, i in self.state.children.items() if i == 1)
+        self.shared_metrics.set(1, 'requests', 10)
+
+        self.recycle()
+        new_pid = self.state.replacement[0]
+        os.kill(new_pid, signal.SIGKILL)
+        os.waitpid(new_pid, 0)
+
+        self.assertTrue(_is_recycling_exit(self.state, new_pid, self.state.children.pop(new_pid)))
+        self.assertIsNone(self.state.replacement)
+        self.assertEqual(sorted(self.state.children.values()), [0, 1])
+
+        # the old child is recycled again with a new replacement
+        self.recycle()
+        self.assertEqual(self.state.replacement[1], old_pid)
+        self.assertEqual(self.state.children[self.state.replacement[0]], 2)
+
+    def test_no_free_id(self):
+        self.wait_for_slots()
+        self.start_child(2)
+        self.shared_metrics.set(1, 'requests', 10)
+
+        self.recycle()
+        self.assertIsNone(self.state.replacement)
+        self.assertEqual(len(self.state.children), 3)
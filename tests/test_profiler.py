@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from frontik import request_context
+from frontik.profiler import SamplingProfiler
+from frontik.request_context import RequestContext
+
+
+def busy_loop(duration):
+    end_time = time.process_time() + duration
+    while time.process_time() < end_time:
+        pass
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed_stacks(self):
+        profiler = SamplingProfiler(0.001)
+        profiler.start()
+
+        token = request_context.initialize(None, 'request_id')
+
+        try:
+            with RequestContext({}):
+                request_context.set_handler_name('pages.busy')
+                busy_loop(0.1)
+        finally:
+            request_context.reset(token)
+            profiler.stop()
+
+        stacks = [line.rsplit(' ', 1) for line in profiler.get_collapsed_stacks().splitlines()]
+        busy_stacks = [(stack, count) for stack, count in stacks if stack.startswith('pages.busy;')]
+        self.assertTrue(busy_stacks)
+
+        stack, count = busy_stacks[0]
+        self.assertIn('busy_loop', stack)
+        self.assertGreater(int(count), 0)
+
+    def test_single_profiler(self):
+        profiler = SamplingProfiler()
+        profiler.start()
+
+        try:
+            self.assertRaises(RuntimeError, SamplingProfiler().start)
+        finally:
+            profiler.stop()
@@ -1,6 +1,6 @@
 import unittest
 
-from .instances import frontik_test_app
+from .instances import frontik_contextvars_app, frontik_test_app
 
 
 class TestRequestContext(unittest.TestCase):
@@ -11,6 +11,20 @@ class TestRequestContext(unittest.TestCase):
             'page': 'request_context',
             'callback': 'request_context',
             'executor': None,
+            'default_executor': 'request_context',
+            'future': 'request_context',
+            'coroutine_before_yield': 'request_context',
+            'coroutine_after_yield': 'request_context'
+        })
+
+    def test_request_context_contextvars_mode(self):
+        json = frontik_contextvars_app.get_page_json('request_context')
+
+        self.assertEqual(json, {
+            'page': 'request_context',
+            'callback': 'request_context',
+            'executor': None,
+            'default_executor': 'request_context',
             'future': 'request_context',
             'coroutine_before_yield': 'request_context',
             'coroutine_after_yield': 'request_context'
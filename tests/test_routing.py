@@ -1,6 +1,7 @@
+import re
 import unittest
 
-from frontik.routing import MAX_MODULE_NAME_LENGTH
+from frontik.routing import MAX_MODULE_NAME_LENGTH, RoutesPrefixIndex, get_literal_prefix
 
 from .instances import frontik_re_app, frontik_test_app
 
@@ -53,6 +54,12 @@ class TestRouting(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.content, b'<html><title>404: Not Found</title><body>404: Not Found</body></html>')
 
+    def test_filemapping_cached_pages(self):
+        for _ in range(2):
+            self.assertEqual(frontik_test_app.get_page('no_page').status_code, 404)
+            self.assertEqual(frontik_test_app.get_page('//simple_xml').status_code, 200)
+            self.assertEqual(frontik_test_app.get_page('error_on_import').status_code, 500)
+
     def test_filemapping_404_on_dot_in_url(self):
         self.assertEqual(frontik_test_app.get_page('/nested/nested.nested').status_code, 404)
 
@@ -75,3 +82,26 @@ class TestRouting(unittest.TestCase):
 
         response = frontik_re_app.get_page('reverse_url?fail_missing=true')
         self.assertEqual(response.status_code, 500)
+
+
+class TestRoutesPrefixIndex(unittest.TestCase):
+    def test_literal_prefix(self):
+        self.assertEqual(get_literal_prefix(re.compile(r'^/id/(?P<id>[^/]+)')), '/id/')
+        self.assertEqual(get_literal_prefix(re.compile(r'/simple/?$')), '/simple')
+        self.assertEqual(get_literal_prefix(re.compile(r'/a\.b')), '/a.b')
+        self.assertEqual(get_literal_prefix(re.compile(r'(?i)/id')), '')
+        self.assertEqual(get_literal_prefix(re.compile(r'/(a|b)')), '/')
+        self.assertEqual(get_literal_prefix(re.compile(r'.*')), '')
+
+    def test_first_match_order(self):
+        patterns = [re.compile(p) for p in (r'/a/b', r'/', r'/a', r'.*', r'/b', r'/a/bc')]
+        index = RoutesPrefixIndex(patterns)
+
+        for url in ('/a/bc', '/a/x', '/b', '/c', 'x', ''):
+            expected = [i for i, p in enumerate(patterns) if p.match(url)]
+            candidates = index.get_candidates(url)
+            self.assertEqual(candidates, sorted(candidates))
+            self.assertEqual([i for i in candidates if patterns[i].match(url)], expected)
+
+        self.assertEqual(index.get_candidates('/a/bc'), [0, 1, 2, 3, 5])
+        self.assertEqual(index.get_candidates('x'), [3])
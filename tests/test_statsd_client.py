@@ -0,0 +1,82 @@
+import socket
+import unittest
+
+from tornado.escape import to_unicode
+
+from frontik.integrations.statsd import AggregatingStatsDClient
+
+
+class TestAggregatingStatsDClient(unittest.TestCase):
+    def setUp(self):
+        self.statsd_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.statsd_socket.settimeout(0.1)
+        self.statsd_socket.bind(('127.0.0.1', 0))
+
+        port = self.statsd_socket.getsockname()[1]
+        self.client = AggregatingStatsDClient('127.0.0.1', port, app='app', max_udp_size=100)
+
+    def tearDown(self):
+        self.client.stop()
+        self.statsd_socket.close()
+
+    def receive(self):
+        datagrams = []
+        try:
+            while True:
+                datagrams.append(to_unicode(self.statsd_socket.recv(1024)))
+        except socket.timeout:
+            pass
+
+        return datagrams
+
+    def test_aggregation(self):
+        self.client.count('count_metric', 1, tag='a')
+        self.client.count('count_metric', 2, tag='a')
+        self.client.count('count_metric', 1, tag='b')
+        self.client.gauge('gauge_metric', 10)
+        self.client.gauge('gauge_metric', 20)
+        self.client.time('time_metric', 5)
+        self.client.time('time_metric', 5)
+        self.client.time('time_metric', 7)
+
+        self.assertEqual(self.receive(), [])
+        self.client.send_aggregated()
+
+        datagrams = self.receive()
+        self.assertTrue(all(len(d) <= 100 for d in datagrams))
+        self.assertGreater(len(datagrams), 1)
+
+        self.assertEqual(sorted('\n'.join(datagrams).split('\n')), [
+            'count_metric.tag_is_a.app_is_app:3|c',
+            'count_metric.tag_is_b.app_is_app:1|c',
+            'gauge_metric.app_is_app:20|g',
+            'time_metric.app_is_app:5|ms|@0.5',
+            'time_metric.app_is_app:7|ms',
+        ])
+
+        self.client.send_aggregated()
+        self.assertEqual(self.receive(), [])
+
+    def test_timers(self):
+        for _ in range(100):
+            self.client.time('time_metric', 12.3401)
+
+        self.client.time('time_metric', 12.3449)
+        self.client.time('time_metric', 0.012345)
+        self.client.send_aggregated()
+
+        self.assertEqual(sorted('\n'.join(self.receive()).split('\n')), [
+            'time_metric.app_is_app:0.0123|ms',
+            'time_metric.app_is_app:12.3|ms|@0.00990099',
+        ])
+
+    def test_tags(self):
+        self.client.count('count_metric', 1, a='1', b='2')
+        self.client.count('count_metric', 1, b='2', a='1')
+        self.client.count('count_metric', 1, a=['1'])
+        self.client.send_aggregated()
+
+        self.assertEqual(sorted('\n'.join(self.receive()).split('\n')), [
+            'count_metric.a_is_1.b_is_2.app_is_app:2|c',
+            "count_metric.a_is_['1'].app_is_app:1|c",
+        ])
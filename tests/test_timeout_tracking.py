@@ -0,0 +1,39 @@
+import unittest
+
+from frontik.timeout_tracking import TimeoutChecker
+
+
+class FakeBalancedRequest:
+    def __init__(self, request_timeout, request_time_left):
+        self.request_timeout = request_timeout
+        self.request_time_left = request_time_left
+
+
+class TestTimeoutChecker(unittest.TestCase):
+    def test_enforce_clamps_timeouts(self):
+        checker = TimeoutChecker('caller', 1000, lambda: 0.4)
+        self.assertAlmostEqual(checker.get_remaining_time_ms(), 600)
+
+        request = FakeBalancedRequest(2.0, 4.0)
+        checker.enforce(request)
+
+        self.assertAlmostEqual(request.request_timeout, 0.6)
+        self.assertAlmostEqual(request.request_time_left, 0.6)
+
+    def test_enforce_keeps_short_timeouts(self):
+        checker = TimeoutChecker('caller', 1000, lambda: 0.1)
+
+        request = FakeBalancedRequest(0.2, 0.4)
+        checker.enforce(request)
+
+        self.assertEqual(request.request_timeout, 0.2)
+        self.assertEqual(request.request_time_left, 0.4)
+
+    def test_enforce_exceeded_timeout(self):
+        checker = TimeoutChecker('caller', 1000, lambda: 1.5)
+
+        request = FakeBalancedRequest(0.2, 0.4)
+        checker.enforce(request)
+
+        self.assertEqual(request.request_timeout, 0.001)
+        self.assertEqual(request.request_time_left, 0.001)
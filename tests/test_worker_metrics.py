@@ -0,0 +1,72 @@
+import os
+import time
+import unittest
+
+from frontik.handler_active_limit import ActiveHandlersLimit
+from frontik.worker_metrics import SharedMetrics, WorkerMetricsUpdater
+
+
+class FakeApplication:
+    def __init__(self):
+        self.requests_count = 0
+        self.loop_lag_probe = None
+
+
+class TestSharedMetrics(unittest.TestCase):
+    def test_shared_between_processes(self):
+        shared_metrics = SharedMetrics(2)
+
+        pid = os.fork()
+        if pid == 0:
+            shared_metrics.set(1, 'pid', os.getpid())
+            shared_metrics.set(1, 'updated', time.time())
+            shared_metrics.set(1, 'active_handlers', 3)
+            os._exit(0)
+
+        os.waitpid(pid, 0)
+
+        status = shared_metrics.get_status()
+        self.assertEqual(len(status['workers']), 1)
+        self.assertEqual(status['workers'][0]['id'], 1)
+        self.assertEqual(status['workers'][0]['pid'], pid)
+        self.assertEqual(status['total']['active_handlers'], 3)
+
+    def test_updater(self):
+        shared_metrics = SharedMetrics(1)
+        app = FakeApplication()
+        updater = WorkerMetricsUpdater(shared_metrics, 0, app)
+        updater.start()
+        updater.stop()
+        self.assertEqual(shared_metrics.get_slot(0)['ready_pid'], 0)
+
+        updater.set_ready()
+        self.assertEqual(shared_metrics.get_slot(0)['ready_pid'], os.getpid())
+
+        app.requests_count = 10
+        ActiveHandlersLimit.count = 2
+
+        try:
+            updater.update()
+        finally:
+            ActiveHandlersLimit.count = 0
+
+        worker = shared_metrics.get_status()['workers'][0]
+        self.assertEqual(worker['pid'], os.getpid())
+        self.assertFalse(worker['stale'])
+        self.assertEqual(worker['requests'], 10)
+        self.assertGreater(worker['requests_per_sec'], 0)
+        self.assertEqual(worker['active_handlers'], 2)
+
+        metrics = shared_metrics.get_metrics().splitlines()
+        self.assertIn(f'frontik_worker_requests{{worker="0",pid="{os.getpid()}"}} 10', metrics)
+        self.assertIn('frontik_active_handlers 2', metrics)
+
+    def test_stale_worker(self):
+        shared_metrics = SharedMetrics(1)
+        shared_metrics.set(0, 'pid', 1)
+        shared_metrics.set(0, 'updated', time.time() - 60)
+        shared_metrics.set(0, 'active_handlers', 5)
+
+        status = shared_metrics.get_status()
+        self.assertTrue(status['workers'][0]['stale'])
+        self.assertEqual(status['total']['active_handlers'], 0)
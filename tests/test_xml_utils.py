@@ -4,7 +4,8 @@ import unittest
 from lxml import etree
 from lxml_asserts.testcase import LxmlTestCaseMixin
 
-from frontik.xml_util import dict_to_xml, xml_from_file, xml_to_dict
+from frontik.doc import Doc
+from frontik.xml_util import CachedXmlFragment, SharedXml, dict_to_xml, xml_from_file, xml_to_dict
 
 XML = etree.XML('''
     <root>
@@ -98,3 +99,73 @@ class TestXmlUtils(unittest.TestCase, LxmlTestCaseMixin):
             xml_from_file(self.XML_SYNTAX_ERROR_FILE, log)
 
         self.assertIn('failed to parse xml file', log.message)
+
+    def test_cached_xml_fragment_read_only(self):
+        shared = etree.XML('<root a="1"><child>text</child></root>')
+        fragment = CachedXmlFragment(SharedXml(shared))
+
+        self.assertEqual(fragment.get('a'), '1')
+        self.assertEqual(fragment.findtext('child'), 'text')
+        self.assertEqual(len(fragment), 1)
+        self.assertFalse(fragment.is_copied())
+
+    def test_cached_xml_fragment_copy_on_write(self):
+        shared = etree.XML('<root a="1"><child>text</child></root>')
+        fragment = CachedXmlFragment(SharedXml(shared))
+
+        fragment.set('a', '2')
+        fragment.text = 'new text'
+        fragment.append(etree.Element('other'))
+
+        self.assertTrue(fragment.is_copied())
+        self.assertEqual(fragment.get('a'), '2')
+        self.assertEqual(fragment.text, 'new text')
+        self.assertEqual(len(fragment), 2)
+
+        self.assertXmlEqual(shared, etree.XML('<root a="1"><child>text</child></root>'))
+
+    def test_cached_xml_fragment_attrib_and_items(self):
+        shared = etree.XML('<root a="1"><child>text</child></root>')
+        fragment = CachedXmlFragment(SharedXml(shared))
+
+        self.assertEqual(fragment[0].text, 'text')
+        self.assertEqual([child.tag for child in fragment], ['child'])
+        self.assertFalse(fragment.is_copied())
+
+        fragment.attrib['a'] = '2'
+        del fragment[0]
+
+        self.assertTrue(fragment.is_copied())
+        self.assertXmlEqual(fragment.element, etree.XML('<root a="2"/>'))
+        self.assertXmlEqual(shared, etree.XML('<root a="1"><child>text</child></root>'))
+
+    def test_cached_xml_fragment_in_doc(self):
+        shared = etree.XML('<root><child>text</child></root>')
+
+        first_doc = Doc().put(CachedXmlFragment(SharedXml(shared)))
+        second_doc = Doc().put(CachedXmlFragment(SharedXml(shared)))
+
+        self.assertXmlEqual(first_doc.to_etree_element(), etree.XML('<doc><root><child>text</child></root></doc>'))
+        self.assertXmlEqual(second_doc.to_etree_element(), etree.XML('<doc><root><child>text</child></root></doc>'))
+        self.assertIsNone(shared.getparent())
+
+    def test_cached_xml_fragment_to_string(self):
+        shared = SharedXml(etree.XML('<root><child>text</child></root>'))
+        fragments = [CachedXmlFragment(shared), CachedXmlFragment(shared)]
+        doc = Doc().put(etree.Element('first')).put(fragments)
+
+        self.assertXmlEqual(
+            etree.fromstring(doc.to_string()),
+            etree.XML('<doc><first/><root><child>text</child></root><root><child>text</child></root></doc>')
+        )
+        self.assertFalse(any(fragment.is_copied() for fragment in fragments))
+        self.assertIsNone(shared.element.getparent())
+        self.assertEqual(len(doc.root_node), 1)
+
+    def test_modified_cached_xml_fragment_to_string(self):
+        shared = SharedXml(etree.XML('<root/>'))
+        fragment = CachedXmlFragment(shared)
+        fragment.set('a', '1')
+
+        self.assertXmlEqual(etree.fromstring(Doc().put(fragment).to_string()), etree.XML('<doc><root a="1"/></doc>'))
+        self.assertXmlEqual(shared.element, etree.XML('<root/>'))
@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from frontik.file_cache import FileCache
+from frontik.producers.xsl_executor import XslProcessError, XslProcessPoolExecutor, apply_xsl_in_process
+from frontik.xml_util import xsl_from_file
+
+XSL_DIR = os.path.join(os.path.dirname(__file__), 'projects', 'test_app', 'xsl')
+
+
+class TestXslProcessPoolExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = XslProcessPoolExecutor(1, FileCache('XSL', XSL_DIR, xsl_from_file))
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_apply_xsl(self):
+        future = self.executor.submit(apply_xsl_in_process, 'simple.xsl', b'<doc><ok/></doc>', False)
+        start_time, result, error_log, xslt_profile = future.result()
+
+        self.assertEqual(result, '<html><body><h1>ok</h1></body></html>\n')
+        self.assertEqual(error_log, [])
+        self.assertIsNone(xslt_profile)
+
+    def test_apply_xsl_profile(self):
+        future = self.executor.submit(apply_xsl_in_process, 'simple.xsl', b'<doc><ok/></doc>', True)
+        self.assertIn(b'<profile>', future.result()[3])
+
+    def test_apply_error(self):
+        future = self.executor.submit(apply_xsl_in_process, 'apply_error.xsl', b'<doc/>', False)
+
+        with self.assertRaises(XslProcessError) as e:
+            future.result()
+
+        self.assertIn('XSLTApplyError', str(e.exception))
+        self.assertTrue(e.exception.error_log[0].filename.endswith('apply_error.xsl'))
+
+    def test_parse_error(self):
+        future = self.executor.submit(apply_xsl_in_process, 'parse_error.xsl', b'<doc/>', False)
+
+        with self.assertRaises(XslProcessError) as e:
+            future.result()
+
+        self.assertIn('failed loading XSL file parse_error.xsl', str(e.exception))